@@ -0,0 +1,256 @@
+# Benchmarks for building and searching graphs
+
+# The only graph in `intro_graph_problems.py` is the 6-node graph of `testSP`, which is far too
+# small to show how the code behaves as graphs grow. This file makes bigger graphs of four kinds
+# (all seeded, so every run builds exactly the same graphs):
+
+# * `randomSparse`: n nodes, each edge goes between two random nodes
+# * `grid`: a square grid, each node linked to its right and lower neighbours (both directions)
+# * `scaleFree`: preferential attachment (Barabasi-Albert), a few hubs with many edges
+# * `longChain`: 0->1->2->...->n-1, the worst case for recursion depth
+
+# For each graph it times building it (`addNode`/`addEdge`), `BFS` (each mode), and the
+# depth-first searches: the recursive `DFS`, `shortestPath` (branch and bound, the default) and
+# `shortestPath` with iterative deepening. The searches start at node 0 and go to a "near" node
+# (`dfsDepth` edges away: depth-first search is exponential in the length of the path) and, for
+# BFS, also to the "far" node (the last one BFS reaches). On `longChain` there is only one path, so
+# the depth-first searches also answer the far query, n - 1 edges deep: the recursive `DFS` is
+# then expected to fail with RecursionError. Without iterative deepening, a depth-first search may
+# try exponentially many paths before it can prune (hubs in `scaleFree` graphs), so every search
+# is first run once with a budget of `dfsBudget` expanded nodes, and only timed if it finished
+# within it. A search that fails is recorded with its `error` and `seconds` null. For each it
+# records:
+
+# * `seconds`: wall time (the best of `repeat` runs)
+# * `peakBytes`: the peak memory allocated during the operation (a separate run under tracemalloc,
+#   which slows the code down too much to time it at the same time)
+# * `nodesExpanded`: how many nodes the search expanded (counted by a `SearchCounter`)
+
+# The results are printed (or written to a file) as JSON, one record per graph and operation, and
+# `--compare old.json` prints how much slower or faster each operation got since an earlier run:
+
+#     python graph_benchmark.py --sizes 100 1000 10000 --output new.json --compare old.json
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from intro_graph_problems import (Node, Edge, Digraph, BFS, BFSTree, DFS, shortestPath,
+                                  SearchCounter)
+
+
+# ..................................................................................................
+# Graph generators: each one returns (numNodes, edges), edges a list of (source, destination)
+# pairs of node numbers
+
+def randomSparse(n, seed = 0, degree = 3):
+    """n nodes and about degree * n random edges"""
+    rng = random.Random(seed)
+    return n, [(rng.randrange(n), rng.randrange(n)) for i in range(degree * n)]
+
+def grid(n, seed = 0):
+    """A side x side grid with side * side <= n, edges in both directions between neighbours"""
+    side = max(int(n ** 0.5), 1)
+    edges = []
+    for row in range(side):
+        for col in range(side):
+            node = row * side + col
+            if col + 1 < side:
+                edges.append((node, node + 1))
+                edges.append((node + 1, node))
+            if row + 1 < side:
+                edges.append((node, node + side))
+                edges.append((node + side, node))
+    return side * side, edges
+
+def scaleFree(n, seed = 0, links = 2):
+    """Every new node links (both ways) to links earlier nodes, picked with probability
+       proportional to how many edges they already have"""
+    rng = random.Random(seed)
+    edges = []
+    ends = list(range(min(links, n))) #one entry per edge end, so picking from it favours hubs
+    for node in range(links, n):
+        targets = set()
+        while len(targets) < links:
+            targets.add(rng.choice(ends))
+        for target in sorted(targets):
+            edges.append((node, target))
+            edges.append((target, node))
+            ends.extend((node, target))
+    return n, edges
+
+def longChain(n, seed = 0):
+    """0->1->2->...->n-1"""
+    return n, [(i, i + 1) for i in range(n - 1)]
+
+GENERATORS = {'randomSparse': randomSparse, 'grid': grid, 'scaleFree': scaleFree,
+              'longChain': longChain}
+
+# ..................................................................................................
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class BudgetCounter(SearchCounter):
+    # A SearchCounter that stops the search (raises BudgetExceeded) after budget expanded nodes
+    def __init__(self, budget):
+        SearchCounter.__init__(self)
+        self.budget = budget
+    def nodeExpanded(self, node, frontierSize, getPath):
+        SearchCounter.nodeExpanded(self, node, frontierSize, getPath)
+        if self.expanded > self.budget:
+            raise BudgetExceeded('more than ' + str(self.budget) + ' nodes expanded')
+
+
+def buildGraph(numNodes, edges):
+    nodes = [Node(str(i)) for i in range(numNodes)]
+    g = Digraph()
+    for node in nodes:
+        g.addNode(node)
+    for src, dest in edges:
+        g.addEdge(Edge(nodes[src], nodes[dest]))
+    return g
+
+
+def measure(operation, repeat):
+    """Runs operation (a function of no arguments) repeat times, then once more under tracemalloc
+       Returns (best seconds, peak bytes, the value of the last run)"""
+    best = None
+    for i in range(repeat):
+        began = time.perf_counter()
+        value = operation()
+        elapsed = time.perf_counter() - began
+        if best is None or elapsed < best:
+            best = elapsed
+    tracemalloc.start()
+    try:
+        operation()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, value
+
+
+def queryEnds(graph, start, dfsDepth):
+    """Returns (bfsEnd, dfsEnd): the node farthest from start, and a node dfsDepth edges from start
+       (or the farthest one, if none is that far); the depth-first search is exponential in the
+       length of the path, so it gets the shorter query"""
+    tree = BFSTree(graph, start)
+    depth = {start: 0}
+    for node in tree: #a dict keeps insertion order, which is BFS order
+        if tree[node] is not None:
+            depth[node] = depth[tree[node]] + 1
+    bfsEnd = node
+    dfsEnd = bfsEnd
+    for node in tree:
+        if depth[node] == dfsDepth:
+            dfsEnd = node
+            break
+    return bfsEnd, dfsEnd
+
+
+def benchmark(family, size, seed = 0, repeat = 3, dfsDepth = 4, dfsBudget = 200000):
+    """Returns a list of result records (dicts) for one generated graph"""
+    numNodes, edges = GENERATORS[family](size, seed)
+    base = {'family': family, 'size': size, 'seed': seed, 'numNodes': numNodes,
+            'numEdges': len(edges)}
+    records = []
+    def record(operation, seconds, peak, expanded, error = None):
+        records.append(dict(base, operation = operation, seconds = seconds, peakBytes = peak,
+                            nodesExpanded = expanded))
+        if error is not None:
+            records[-1]['error'] = error
+
+    def timeSearch(operation, search):
+        """Counts the nodes search (a function of an observer) expands, within dfsBudget, then
+           times it in runs of its own (observing is not free)"""
+        counter = BudgetCounter(dfsBudget)
+        try:
+            search(counter)
+        except (RecursionError, BudgetExceeded) as e:
+            record(operation, None, None, None, type(e).__name__ + ': ' + str(e))
+            return
+        seconds, peak, path = measure(lambda: search(None), repeat)
+        record(operation, seconds, peak, counter.expanded)
+
+    seconds, peak, g = measure(lambda: buildGraph(numNodes, edges), repeat)
+    record('build', seconds, peak, None)
+
+    start = next(iter(g.nodes))
+    bfsEnd, dfsEnd = queryEnds(g, start, dfsDepth)
+    # every BFS mode answers the short (near) query; the textbook 'paths' mode keeps every path
+    # it has seen, which blows up on the long (far) query, so only the other modes answer that one
+    for query, end, modes in (('near', dfsEnd, ['parents', 'bidirectional', 'paths']),
+                              ('far', bfsEnd, ['parents', 'bidirectional'])):
+        for mode in modes:
+            timeSearch('BFS ' + mode + ' ' + query,
+                       lambda observer: BFS(g, start, end, mode = mode, observer = observer))
+
+    # iterative deepening repeats the search once per depth: quadratic on the far chain query
+    queries = [('near', dfsEnd, True)]
+    if family == 'longChain':
+        queries.append(('far', bfsEnd, False))
+    for query, end, deepening in queries:
+        timeSearch('DFS ' + query,
+                   lambda observer: DFS(g, start, end, [], None, observer = observer))
+        timeSearch('shortestPath ' + query,
+                   lambda observer: shortestPath(g, start, end, observer = observer))
+        if deepening:
+            timeSearch('shortestPath deepening ' + query,
+                       lambda observer: shortestPath(g, start, end, iterativeDeepening = True,
+                                                     observer = observer))
+    return records
+
+
+def compareResults(old, new):
+    """Assumes old and new are lists of records
+       Returns a list of lines, one per record in both, with the ratio new seconds / old seconds"""
+    key = lambda r: (r['family'], r['size'], r['seed'], r['operation'])
+    before = {key(r): r for r in old}
+    lines = []
+    for r in new:
+        if key(r) in before and r['seconds'] is not None and before[key(r)]['seconds']:
+            ratio = r['seconds'] / before[key(r)]['seconds']
+            lines.append('%-12s %8d  %-28s %6.2fx %s' % (r['family'], r['size'], r['operation'],
+                                                         ratio,
+                                                         'slower' if ratio > 1 else 'faster'))
+    return lines
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark graph building and searching')
+    parser.add_argument('--families', nargs = '+', default = sorted(GENERATORS),
+                        choices = sorted(GENERATORS))
+    parser.add_argument('--sizes', nargs = '+', type = int, default = [100, 1000, 10000])
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--repeat', type = int, default = 3)
+    parser.add_argument('--dfs-budget', type = int, default = 200000,
+                        help = 'most nodes a depth-first search may expand')
+    parser.add_argument('--output', help = 'write the JSON results to this file')
+    parser.add_argument('--compare', help = 'JSON results of an earlier run to compare against')
+    args = parser.parse_args(argv)
+
+    records = []
+    for family in args.families:
+        for size in args.sizes:
+            records.extend(benchmark(family, size, args.seed, args.repeat,
+                                     dfsBudget = args.dfs_budget))
+
+    text = json.dumps(records, indent = 1)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            for line in compareResults(json.load(f), records):
+                print(line, file = sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
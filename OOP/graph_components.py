@@ -0,0 +1,128 @@
+# Whole-graph passes: connected components, strongly connected components, topological order
+
+# Questions like "which nodes can reach each other?" can be answered with `shortestPath` between
+# every pair of nodes, but that is V^2 searches. Each function below answers it for the whole graph
+# in one pass, O(V+E), using only `graph.nodes` and `graph.childrenOf` (so it works on a `Digraph`,
+# a `Graph` or a `FrozenDigraph`). None of them recurse, so long chains are not a problem.
+
+# * `connectedComponents`: for a `Graph`, the groups of nodes joined by paths (for a `Digraph`, the
+#   edge directions are ignored: "weakly" connected components). Union-find.
+# * `stronglyConnectedComponents`: for a `Digraph`, the groups of nodes that can all reach each
+#   other. Tarjan's algorithm with an explicit stack.
+# * `topologicalSort`: for a `Digraph` with no cycles, an order of the nodes in which every edge
+#   goes from an earlier node to a later one. Kahn's algorithm.
+
+
+def connectedComponents(graph):
+    """Assumes graph is a Graph (or a Digraph, whose edges are then taken as undirected)
+       Returns a list of components, each a list of nodes, in the order of graph.nodes"""
+    # union-find over node positions: parent[i] == i for the root of each set. Union by size keeps
+    # the trees shallow and path halving flattens them as they are walked, so each operation is
+    # close to O(1).
+    nodes = list(graph.nodes)
+    ids = {}
+    for i in range(len(nodes)):
+        ids[nodes[i]] = i
+    parent = list(range(len(nodes)))
+    size = [1] * len(nodes)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for src in nodes:
+        for dest in graph.childrenOf(src):
+            a, b = find(ids[src]), find(ids[dest])
+            if a != b:
+                if size[a] < size[b]:
+                    a, b = b, a
+                parent[b] = a
+                size[a] += size[b]
+
+    components = {}
+    for i in range(len(nodes)):
+        components.setdefault(find(i), []).append(nodes[i])
+    return list(components.values())
+
+
+def stronglyConnectedComponents(graph):
+    """Assumes graph is a Digraph
+       Returns a list of strongly connected components, each a list of nodes. A component comes
+       after every component it has edges to (reverse topological order)"""
+    index = {}     #the order in which each node was first reached
+    lowLink = {}   #the smallest index reachable from the node through the nodes still on stack
+    stack = []     #nodes whose component has not been finished yet
+    onStack = set()
+    components = []
+    counter = 0
+
+    for root in graph.nodes:
+        if root in index:
+            continue
+        # each entry of work is a node and an iterator over its children: what a recursive call
+        # would keep on the call stack
+        index[root] = lowLink[root] = counter
+        counter += 1
+        stack.append(root)
+        onStack.add(root)
+        work = [(root, iter(graph.childrenOf(root)))]
+
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index: #"recurse" into child
+                    index[child] = lowLink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    onStack.add(child)
+                    work.append((child, iter(graph.childrenOf(child))))
+                elif child in onStack:
+                    lowLink[node] = min(lowLink[node], index[child])
+                continue
+
+            # every child of node is done: "return" from node
+            work.pop()
+            if work:
+                caller = work[-1][0]
+                lowLink[caller] = min(lowLink[caller], lowLink[node])
+            if lowLink[node] == index[node]: #node is the root of a component
+                component = []
+                while True:
+                    member = stack.pop()
+                    onStack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+def topologicalSort(graph):
+    """Assumes graph is a Digraph
+       Returns a list of all the nodes of graph such that every edge goes from a node to a node
+       later in the list; raises ValueError if graph has a cycle (so no such order exists)"""
+    inDegree = {}
+    for node in graph.nodes:
+        inDegree.setdefault(node, 0)
+        for child in graph.childrenOf(node):
+            inDegree[child] = inDegree.get(child, 0) + 1
+
+    # repeatedly take a node that no remaining edge points to
+    ready = [node for node in graph.nodes if inDegree[node] == 0]
+    ready.reverse() #used as a stack: nodes come out in the order of graph.nodes
+    order = []
+    while ready:
+        node = ready.pop()
+        order.append(node)
+        for child in graph.childrenOf(node):
+            inDegree[child] -= 1
+            if inDegree[child] == 0:
+                ready.append(child)
+
+    if len(order) != len(inDegree):
+        raise ValueError('Graph has a cycle')
+    return order
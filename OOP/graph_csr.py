@@ -0,0 +1,157 @@
+# Compact, array-backed storage for a graph that is no longer going to change
+
+# `Digraph` keeps a Python dict of children (and their weights) for every node, plus another dict of
+# parents, which is convenient while the graph is being built or changed but costs two dict objects
+# per node and a hash-table entry for every edge in each. Once the graph is complete it can be
+# "frozen" into a compressed sparse row (CSR) layout:
+
+# * every node is interned to an integer id (its position in `nodes`)
+# * `targets` is one flat `array('i')` holding the ids of the children of node 0, then the children
+#   of node 1, and so on
+# * `offsets` is an `array('i')` with one entry per node plus one; the children of node `i` are
+#   `targets[ offsets[i] : offsets[i+1] ]`
+# * `weights` is an `array('d')` parallel to `targets` with the weight of each edge, or None if
+#   every edge weighs 1.0 (`freeze` leaves it out for unweighted graphs)
+
+# A `FrozenDigraph` answers the same questions as a `Digraph` (`childrenOf`, `hasNode`, `nodes`,
+# `str()`, `weightedChildrenOf`, `parentsOf`), so `DFS`, `BFS`, `shortestPath`, `dijkstra` and
+# `aStar` work on it unchanged.
+
+from array import array
+import io
+import itertools
+from collections.abc import Sequence
+
+from intro_graph_problems import Graph, writeGraph
+
+
+class ChildrenView(Sequence):
+    """A read-only view of the children of one node
+    ids is a memoryview slice of the targets array, nodes the list that maps an id to a node.
+    Nothing is copied: ids are turned into nodes only when they are read"""
+    __slots__ = ('ids', 'nodes')
+    def __init__(self, ids, nodes):
+        self.ids = ids
+        self.nodes = nodes
+    def __len__(self):
+        return len(self.ids)
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ChildrenView(self.ids[i], self.nodes)
+        return self.nodes[self.ids[i]]
+    def __iter__(self):
+        nodes = self.nodes
+        for i in self.ids:
+            yield nodes[i]
+    def __repr__(self):
+        return 'ChildrenView([' + ', '.join(str(node) for node in self) + '])'
+
+
+class FrozenDigraph(object):
+    #nodes is a list of the nodes in the graph; a node's id is its index in the list
+    #ids is a dict mapping each node to its id
+    #offsets, targets and weights hold the adjacency in CSR form (see the top of this file)
+    #undirected is True for a frozen Graph (every edge is stored in both directions)
+    #reverse is a FrozenDigraph with every edge turned around, built the first time parentsOf is
+    #called on a directed graph (or read from the snapshot, see `graph_snapshot.py`)
+    def __init__(self, nodes, offsets, targets, weights = None, undirected = False):
+        """Assumes nodes is a list of nodes, offsets and targets are sequences of ints (arrays or
+        memoryviews) with len(offsets) == len(nodes) + 1, weights is None (every edge weighs 1.0)
+        or a sequence of floats as long as targets, undirected a bool"""
+        if len(offsets) != len(nodes) + 1:
+            raise ValueError('offsets does not match nodes')
+        if weights is not None and len(weights) != len(targets):
+            raise ValueError('weights does not match targets')
+        self.nodes = nodes
+        self.ids = {}
+        for i in range(len(nodes)):
+            self.ids[nodes[i]] = i
+        self.offsets = offsets
+        self.targets = targets
+        self.targetView = memoryview(targets)
+        self.weights = weights
+        self.version = 0 #never changes; here so caches can treat it like a Digraph
+        self.undirected = undirected
+        self.reverse = None
+        if weights is not None:
+            self.weightView = memoryview(weights)
+    def addNode(self, node):
+        raise ValueError('Graph is frozen')
+    def addEdge(self, edge):
+        raise ValueError('Graph is frozen')
+    def idOf(self, node):
+        return self.ids[node]
+    def nodeOf(self, nodeId):
+        return self.nodes[nodeId]
+    def childIdsOf(self, nodeId):
+        """Returns a memoryview (no copy) of the ids of the children of node number nodeId"""
+        return self.targetView[self.offsets[nodeId]:self.offsets[nodeId + 1]]
+    def childrenOf(self, node):
+        return ChildrenView(self.childIdsOf(self.ids[node]), self.nodes)
+    def weightedChildrenOf(self, node):
+        """Returns an iterator of (child, weight) pairs"""
+        nodeId = self.ids[node]
+        children = self.childrenOf(node)
+        if self.weights is None:
+            return zip(children, itertools.repeat(1.0))
+        return zip(children, self.weightView[self.offsets[nodeId]:self.offsets[nodeId + 1]])
+    def parentsOf(self, node):
+        if self.undirected:
+            return self.childrenOf(node)
+        if self.reverse is None:
+            self.reverse = reverseOf(self)
+        return self.reverse.childrenOf(node)
+    def hasNode(self, node):
+        return node in self.ids
+    def numEdges(self):
+        return len(self.targets)
+    def __str__(self):
+        out = io.StringIO()
+        writeGraph(self, out)
+        return out.getvalue()
+
+
+def reverseOf(graph):
+    """Assumes graph is a FrozenDigraph
+    Returns a FrozenDigraph with the same nodes and every edge turned around (a counting sort of the
+    edges by destination, O(V+E)), sharing graph's nodes list"""
+    numNodes = len(graph.nodes)
+    offsets = array('i', [0]) * (numNodes + 1)
+    for dest in graph.targets:
+        offsets[dest + 1] += 1
+    for i in range(numNodes):
+        offsets[i + 1] += offsets[i]
+    nextSlot = array('i', offsets[:numNodes])
+    targets = array('i', [0]) * len(graph.targets)
+    weights = None if graph.weights is None else array('d', [0.0]) * len(graph.targets)
+    for src in range(numNodes):
+        for k in range(graph.offsets[src], graph.offsets[src + 1]):
+            dest = graph.targets[k]
+            targets[nextSlot[dest]] = src
+            if weights is not None:
+                weights[nextSlot[dest]] = graph.weights[k]
+            nextSlot[dest] += 1
+    return FrozenDigraph(graph.nodes, offsets, targets, weights)
+
+def freeze(graph):
+    """Assumes graph is a Digraph (or a Graph)
+    Returns a FrozenDigraph with the same nodes, in the same order, and the same edges (with
+    weights None if every edge weighs 1.0, so unweighted graphs do not store them)"""
+    nodes = list(graph.nodes)
+    ids = {}
+    for i in range(len(nodes)):
+        ids[nodes[i]] = i
+    offsets = array('i', [0])
+    targets = array('i')
+    weights = array('d')
+    weighted = False
+    for node in nodes:
+        for child, weight in graph.weightedChildrenOf(node):
+            targets.append(ids[child])
+            weights.append(weight)
+            if weight != 1.0:
+                weighted = True
+        offsets.append(len(targets))
+    if not weighted:
+        weights = None
+    return FrozenDigraph(nodes, offsets, targets, weights, isinstance(graph, Graph))
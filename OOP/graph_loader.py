@@ -0,0 +1,129 @@
+# Loading a Digraph (or Graph) from an edge-list or CSV file
+
+# `testSP` builds its graph by hand, one `g.addEdge(Edge(nodes[0], nodes[1]))` at a time. For a
+# graph stored in a file that would mean one `Edge` object per line, thrown away as soon as it has
+# been added. The loaders below read the file one line at a time and call `graph.connect(src,
+# dest, weight)` directly instead:
+
+# * node names are interned as they are read: the first time a name is seen a `Node` is created
+#   and added to the graph; after that the same `Node` is reused
+# * only the current line is held in memory (plus the graph being built)
+# * a large edge-list file is read through `mmap` in blocks of about `BLOCK_SIZE` bytes, each cut
+#   at its last line break, decoded at once and split into lines: a few big C calls per block
+#   instead of a readline and a decode per line (about 15% faster than iterating over the file)
+
+# Edge-list format: one edge per line, `source destination` or (if `weighted`) `source destination
+# weight`, separated by whitespace (or by `delimiter`). Blank lines and lines starting with
+# `comment` are skipped.
+
+import csv
+import mmap
+import os
+
+from intro_graph_problems import Digraph, Node
+
+
+MMAP_THRESHOLD = 16 * 1024 * 1024 #files at least this big (in bytes) are read through mmap
+BLOCK_SIZE = 1024 * 1024 #bytes of the mapped file decoded at a time
+
+
+def nodeInterner(graph):
+    """Assumes graph is a Digraph
+       Returns a function from a node name to the Node with that name, adding it to graph the
+       first time the name is seen (nodes already in graph are reused)"""
+    byName = {}
+    for node in graph.nodes:
+        byName[node.getName()] = node
+    def intern(name):
+        node = byName.get(name)
+        if node is None:
+            node = Node(name)
+            graph.addNode(node)
+            byName[name] = node
+        return node
+    return intern
+
+
+def readLines(fileName, useMmap = None):
+    """Yields the lines of fileName (as strings, without the line break) one at a time
+       useMmap is True, False or None (use mmap only for files of at least MMAP_THRESHOLD bytes)"""
+    size = os.path.getsize(fileName)
+    if useMmap is None:
+        useMmap = size >= MMAP_THRESHOLD
+    if not useMmap or size == 0: #an empty file can not be mapped
+        with open(fileName, encoding = 'utf-8') as f:
+            for line in f:
+                yield line.rstrip('\r\n')
+        return
+    with open(fileName, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                # cut the block after its last line break (a line break never falls inside a
+                # UTF-8 character, so each block decodes on its own)
+                stop = min(start + BLOCK_SIZE, size)
+                if stop < size:
+                    cut = mm.rfind(b'\n', start, stop)
+                    if cut < 0: #a line longer than the block: read up to its end
+                        cut = mm.find(b'\n', stop)
+                    stop = size if cut < 0 else cut + 1
+                lines = mm[start:stop].decode('utf-8').split('\n')
+                if lines[-1] == '': #the block ended with a line break
+                    lines.pop()
+                for line in lines:
+                    yield line.rstrip('\r')
+                start = stop
+
+
+def addEdgeFields(graph, intern, fields, weighted, lineNumber):
+    """Adds the edge described by fields (a list of strings) to graph"""
+    if len(fields) != (3 if weighted else 2):
+        raise ValueError('Line ' + str(lineNumber) + ': expected '
+                         + ('source, destination and weight' if weighted
+                            else 'source and destination'))
+    if weighted:
+        try:
+            weight = float(fields[2])
+        except ValueError:
+            raise ValueError('Line ' + str(lineNumber) + ': bad weight ' + repr(fields[2]))
+        graph.connect(intern(fields[0]), intern(fields[1]), weight)
+    else:
+        graph.connect(intern(fields[0]), intern(fields[1]))
+
+
+def loadEdgeList(fileName, graph = None, weighted = False, delimiter = None, comment = '#',
+                 useMmap = None):
+    """Assumes fileName is an edge-list file (see the top of this file), graph is None (a new
+       Digraph is made) or a Digraph/Graph to add the edges to
+       Returns graph"""
+    if graph is None:
+        graph = Digraph()
+    intern = nodeInterner(graph)
+    lineNumber = 0
+    for line in readLines(fileName, useMmap):
+        lineNumber += 1
+        line = line.strip()
+        if line == '' or (comment and line.startswith(comment)):
+            continue
+        fields = [field.strip() for field in line.split(delimiter)]
+        addEdgeFields(graph, intern, fields, weighted, lineNumber)
+    return graph
+
+
+def loadCSV(fileName, graph = None, weighted = False, header = True, delimiter = ','):
+    """Assumes fileName is a CSV file with columns source, destination (and weight, if weighted),
+       header a bool saying whether the first row holds column names, graph is None (a new
+       Digraph is made) or a Digraph/Graph to add the edges to
+       Returns graph"""
+    if graph is None:
+        graph = Digraph()
+    intern = nodeInterner(graph)
+    with open(fileName, newline = '', encoding = 'utf-8') as f:
+        rows = csv.reader(f, delimiter = delimiter)
+        if header:
+            next(rows, None)
+        for row in rows:
+            if len(row) == 0:
+                continue
+            addEdgeFields(graph, intern, row, weighted, rows.line_num)
+    return graph
@@ -0,0 +1,114 @@
+# Running BFS from many source nodes at once, on several processes
+
+# `BFS` uses one core. When we need the distances from many sources over the same large graph, the
+# searches are independent and can run side by side in a `ProcessPoolExecutor`. What must not
+# happen is sending (pickling) the graph with every task: for a large graph that would cost more
+# than the search itself. Instead:
+
+# * the graph is frozen (see `graph_csr.py`) and its `offsets` and `targets` arrays are copied once
+#   into two blocks of `multiprocessing.shared_memory`
+# * every worker process attaches to those blocks when it starts and reads them in place (a
+#   `memoryview` cast to ints), so all workers share one copy of the adjacency
+# * tasks only carry lists of source ids, and results come back as compact arrays of ids and
+#   distances; `parallelBFS` yields them as soon as each chunk finishes, in completion order
+
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from graph_csr import FrozenDigraph, freeze
+
+
+INT_SIZE = array('i').itemsize
+
+# set in each worker process by attachGraph
+workerBlocks = None
+workerOffsets = None
+workerTargets = None
+
+
+def sharedCopy(values):
+    """Assumes values is an array('i') (or a memoryview of ints)
+       Returns a SharedMemory block holding a copy of values"""
+    data = memoryview(values).cast('B')
+    block = shared_memory.SharedMemory(create = True, size = max(len(data), 1))
+    block.buf[:len(data)] = data
+    return block
+
+
+def attachGraph(offsetsName, numOffsets, targetsName, numTargets):
+    """Worker initializer: attaches to the shared offsets and targets arrays"""
+    global workerBlocks, workerOffsets, workerTargets
+    offsetsBlock = shared_memory.SharedMemory(name = offsetsName)
+    targetsBlock = shared_memory.SharedMemory(name = targetsName)
+    workerBlocks = (offsetsBlock, targetsBlock)
+    workerOffsets = offsetsBlock.buf[:numOffsets * INT_SIZE].cast('i')
+    workerTargets = targetsBlock.buf[:numTargets * INT_SIZE].cast('i')
+
+
+def distancesFrom(sourceId, offsets, targets):
+    """BFS over node ids
+       Returns a tuple (reached, dists) of arrays: the ids of the nodes reached from sourceId, in
+       BFS order, and their distances (number of edges) from sourceId"""
+    dist = array('i', [-1]) * (len(offsets) - 1)
+    dist[sourceId] = 0
+    reached = array('i', [sourceId])
+    dists = array('i', [0])
+    nodeQueue = deque([sourceId])
+    while nodeQueue:
+        node = nodeQueue.popleft()
+        nextDist = dist[node] + 1
+        for child in targets[offsets[node]:offsets[node + 1]]:
+            if dist[child] < 0:
+                dist[child] = nextDist
+                reached.append(child)
+                dists.append(nextDist)
+                nodeQueue.append(child)
+    return reached, dists
+
+
+def searchChunk(sourceIds):
+    """Worker task: runs distancesFrom for every id in sourceIds
+       Returns a list of (sourceId, reached bytes, dists bytes)"""
+    results = []
+    for sourceId in sourceIds:
+        reached, dists = distancesFrom(sourceId, workerOffsets, workerTargets)
+        results.append((sourceId, reached.tobytes(), dists.tobytes()))
+    return results
+
+
+def parallelBFS(graph, sources, maxWorkers = None, chunkSize = 16):
+    """Assumes graph is a Digraph, Graph or FrozenDigraph, sources an iterable of nodes of graph,
+       maxWorkers None (one per CPU) or an int, chunkSize the number of sources per task
+       Yields a tuple (source, distances) per source, in the order the searches finish; distances
+       is a dict mapping every node reachable from source to its number of edges from source"""
+    if not isinstance(graph, FrozenDigraph):
+        graph = freeze(graph)
+    nodes = graph.nodes
+    sourceIds = [graph.idOf(source) for source in sources]
+    chunks = [sourceIds[i:i + chunkSize] for i in range(0, len(sourceIds), chunkSize)]
+
+    offsetsBlock = sharedCopy(graph.offsets)
+    targetsBlock = sharedCopy(graph.targets)
+    try:
+        with ProcessPoolExecutor(maxWorkers, initializer = attachGraph,
+                                 initargs = (offsetsBlock.name, len(graph.offsets),
+                                             targetsBlock.name, len(graph.targets))) as pool:
+            futures = [pool.submit(searchChunk, chunk) for chunk in chunks]
+            try:
+                for future in as_completed(futures):
+                    for sourceId, reached, dists in future.result():
+                        reachedIds = array('i')
+                        reachedIds.frombytes(reached)
+                        distances = array('i')
+                        distances.frombytes(dists)
+                        yield nodes[sourceId], dict(zip((nodes[i] for i in reachedIds),
+                                                        distances))
+            finally:
+                for future in futures: #if the caller stops early, drop the work not yet started
+                    future.cancel()
+    finally:
+        for block in (offsetsBlock, targetsBlock):
+            block.close()
+            block.unlink()
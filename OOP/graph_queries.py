@@ -0,0 +1,108 @@
+# Answering many shortest-path questions about the same graph
+
+# Calling `BFS(graph, start, end)` once per (start, end) pair repeats the whole search every time,
+# even when many pairs share the same start. A single BFS run to the end (`BFSTree`) already knows
+# the shortest path from `start` to every node it reached, so:
+
+# * `batchShortestPaths` groups the pairs by start node and runs one BFS per start node
+# * `PathCache` keeps the most recently used BFS trees of one graph, so later batches (or single
+#   queries) with the same start node do no search at all
+
+# A cached tree is only valid for the graph as it was when the tree was built. Every `Digraph`
+# has a `version` that every change increases. When the cache sees a version it did not build its
+# trees for, it reads the graph's change log (`changesSince`) and drops only the trees a change
+# can affect:
+
+# * `addNode`: none (a new node has no edges yet)
+# * `addEdge` from src: the trees that reach src (the new edge may give a shorter path)
+# * `removeEdge` from src to dest: the trees in which src is the parent of dest (any other edge
+#   to dest was never followed by the BFS, so removing it changes nothing)
+# * `removeNode`: the trees that reach the node
+
+# If the change log no longer goes back far enough, all trees are dropped.
+
+from collections import OrderedDict
+
+from intro_graph_problems import BFSTree, pathTo
+
+
+class PathCache(object):
+    #graph is the Digraph whose paths are cached
+    #trees is an OrderedDict mapping a start node to its BFS tree, least recently used first
+    #version is the version of graph the trees were built for
+    def __init__(self, graph, maxSize = 128):
+        """Assumes graph is a Digraph, maxSize an int > 0 (the number of trees kept)"""
+        if maxSize <= 0:
+            raise ValueError('maxSize must be positive')
+        self.graph = graph
+        self.maxSize = maxSize
+        self.trees = OrderedDict()
+        self.version = graph.version
+        self.hits = 0
+        self.misses = 0
+    def clear(self):
+        self.trees.clear()
+        self.version = self.graph.version
+    def update(self):
+        """Drops the trees that changes to the graph since they were built may have made wrong"""
+        changes = self.graph.changesSince(self.version)
+        if changes is None:
+            self.clear()
+            return
+        for change in changes:
+            action = change[1]
+            for start in list(self.trees):
+                tree = self.trees[start]
+                if ((action == 'addEdge' and change[2] in tree)
+                        or (action == 'removeEdge' and change[3] in tree
+                            and tree[change[3]] == change[2])
+                        or (action == 'removeNode' and change[2] in tree)):
+                    del self.trees[start]
+        self.version = self.graph.version
+    def treeFrom(self, start):
+        """Returns the BFS tree of start (a dict mapping each reachable node to its parent)"""
+        if self.version != self.graph.version:
+            self.update()
+        if start in self.trees:
+            self.hits += 1
+            self.trees.move_to_end(start)
+            return self.trees[start]
+        self.misses += 1
+        tree = BFSTree(self.graph, start)
+        self.trees[start] = tree
+        if len(self.trees) > self.maxSize:
+            self.trees.popitem(last = False)
+        return tree
+    def shortestPath(self, start, end):
+        """Returns the same path as BFS(graph, start, end), or None"""
+        tree = self.treeFrom(start)
+        if end not in tree:
+            return None
+        return pathTo(tree, end)
+
+
+def batchShortestPaths(graph, pairs, cache = None):
+    """Assumes graph is a Digraph, pairs an iterable of (start, end) tuples of nodes, cache None or
+       a PathCache of graph
+       Returns a list with one path (or None) per pair, in the order of pairs; each path is the one
+       BFS(graph, start, end) would return"""
+    pairs = list(pairs)
+    if cache is not None and cache.graph is not graph:
+        raise ValueError('cache belongs to another graph')
+
+    # group the positions of the pairs by start node, so each start node is searched once
+    byStart = {}
+    for i in range(len(pairs)):
+        byStart.setdefault(pairs[i][0], []).append(i)
+
+    paths = [None] * len(pairs)
+    for start, positions in byStart.items():
+        if cache is None:
+            tree = BFSTree(graph, start)
+        else:
+            tree = cache.treeFrom(start)
+        for i in positions:
+            end = pairs[i][1]
+            if end in tree:
+                paths[i] = pathTo(tree, end)
+    return paths
@@ -0,0 +1,214 @@
+# An asyncio server that answers shortest-path queries about one graph kept in memory
+
+# Instead of every client loading its own copy of a large graph and running `BFS` itself, one
+# server process keeps the graph and clients ask it over a local socket:
+
+# * the protocol is one JSON object per line. A request is {"start": name, "end": name} with an
+#   optional "id", which is copied into the answer: {"id": ..., "path": [names]} ("path" is null
+#   if there is no path) or {"id": ..., "error": message}. A client may send many requests without
+#   waiting; answers come back as they are ready, so they may be out of order
+# * the event loop only reads, writes and looks things up: the searches run on a pool of worker
+#   processes (or threads), so a slow search never holds up other clients
+# * the graph is not sent to the workers with every query. When the server starts it saves a
+#   snapshot (see `graph_snapshot.py`) and every worker process opens it once, through `mmap`, so
+#   all the workers share the same pages. The snapshot includes the reverse adjacency, so the
+#   backward half of a 'bidirectional' search does not make each worker build its own
+# * if the same (start, end) query is already being searched, a new request for it waits for that
+#   search instead of starting another one
+
+# Run it with `python graph_server.py edges.txt [--port 8765]` (see `graph_loader.py` for the file
+# format), or from Python:
+
+#     server = GraphServer(graph)
+#     await server.start()
+#     paths = await queryPaths(server.host, server.port, [('a', 'b'), ('a', 'c')])
+#     await server.close()
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import json
+import os
+import tempfile
+
+from intro_graph_problems import Node, BFS
+from graph_snapshot import saveSnapshot, loadSnapshot
+from graph_loader import loadEdgeList
+
+
+workerGraph = None #set in each worker process by openSnapshot
+
+
+def openSnapshot(fileName):
+    """Worker initializer: opens the graph snapshot the server saved"""
+    global workerGraph
+    workerGraph = loadSnapshot(fileName)
+
+
+def findPath(graph, startName, endName, mode):
+    """Returns the names of the nodes on a shortest path from the node named startName to the node
+       named endName, or None if there is no path; raises ValueError for an unknown name"""
+    start, end = Node(startName), Node(endName) #nodes are interned by name
+    for node in (start, end):
+        if not graph.hasNode(node):
+            raise ValueError('Node not in graph: ' + node.getName())
+    path = BFS(graph, start, end, mode = mode)
+    if path is None:
+        return None
+    return [node.getName() for node in path]
+
+
+def findPathInWorker(startName, endName, mode):
+    return findPath(workerGraph, startName, endName, mode)
+
+
+class GraphServer(object):
+    #graph is the Digraph (or Graph, or FrozenDigraph) the server answers questions about
+    #inFlight is a dict mapping each (start, end) being searched to the future of its result
+    def __init__(self, graph, host = '127.0.0.1', port = 0, useProcesses = True,
+                 maxWorkers = None, mode = 'bidirectional'):
+        """Assumes graph is a Digraph, host and port where to listen (port 0: any free port),
+           useProcesses a bool (False: search on threads instead of processes), maxWorkers None
+           (one per CPU) or an int, mode the BFS mode to search with"""
+        self.graph = graph
+        self.host = host
+        self.port = port
+        self.useProcesses = useProcesses
+        self.maxWorkers = maxWorkers
+        self.mode = mode
+        self.inFlight = {}
+        self.searches = 0 #the number of searches actually run (coalesced requests don't count)
+        self.server = None
+        self.clients = set() #the writers of the open client connections
+        self.executor = None
+        self.snapshotName = None
+
+    async def start(self):
+        if self.useProcesses:
+            handle, self.snapshotName = tempfile.mkstemp(suffix = '.graph')
+            os.close(handle)
+            saveSnapshot(self.graph, self.snapshotName)
+            self.executor = ProcessPoolExecutor(self.maxWorkers, initializer = openSnapshot,
+                                                initargs = (self.snapshotName,))
+        else:
+            self.executor = ThreadPoolExecutor(self.maxWorkers)
+        self.server = await asyncio.start_server(self.handleClient, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self.clients): #handleClient sees the end of input and returns
+                writer.close()
+            await self.server.wait_closed()
+            self.server = None
+            await asyncio.sleep(0)
+        if self.executor is not None:
+            executor, self.executor = self.executor, None
+            # shutdown waits for the running searches: do it on a thread, not on the event loop
+            await asyncio.to_thread(executor.shutdown)
+        if self.snapshotName is not None:
+            os.remove(self.snapshotName)
+            self.snapshotName = None
+
+    async def shortestPath(self, startName, endName):
+        """Returns the names on a shortest path (or None), sharing the search with any identical
+           query already running"""
+        key = (startName, endName)
+        future = self.inFlight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if self.useProcesses:
+                future = loop.run_in_executor(self.executor, findPathInWorker, startName, endName,
+                                              self.mode)
+            else:
+                future = loop.run_in_executor(self.executor, findPath, self.graph, startName,
+                                              endName, self.mode)
+            self.searches += 1
+            self.inFlight[key] = future
+            future.add_done_callback(lambda done: self.inFlight.pop(key, None))
+        # shield: one client going away must not cancel a search other clients are waiting for
+        return await asyncio.shield(future)
+
+    async def answer(self, line, writer):
+        """Answers one request line"""
+        reply = {'id': None}
+        try:
+            request = json.loads(line)
+            reply['id'] = request.get('id')
+            reply['path'] = await self.shortestPath(str(request['start']), str(request['end']))
+        except (ValueError, KeyError, TypeError, AttributeError) as e: #a bad request
+            reply.pop('path', None)
+            reply['error'] = str(e) if not isinstance(e, KeyError) else 'Missing ' + str(e)
+        except Exception as e: #the search itself failed (a broken pool, out of memory...)
+            reply.pop('path', None)
+            reply['error'] = 'Search failed: ' + type(e).__name__ + ': ' + str(e)
+        try:
+            writer.write(json.dumps(reply).encode('utf-8') + b'\n')
+            await writer.drain()
+        except ConnectionError: #the client is gone: nobody to answer
+            pass
+
+    async def handleClient(self, reader, writer):
+        tasks = set()
+        self.clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(self.answer(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions = True)
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+
+async def queryPaths(host, port, pairs):
+    """Assumes pairs is a list of (start name, end name) tuples
+       Sends them all to the server at host:port and returns the list of answers, in the order of
+       pairs: each a list of names, or None if there is no path; raises ValueError if the server
+       answers with an error"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(len(pairs)):
+            request = {'id': i, 'start': pairs[i][0], 'end': pairs[i][1]}
+            writer.write(json.dumps(request).encode('utf-8') + b'\n')
+        await writer.drain()
+        answers = [None] * len(pairs)
+        for i in range(len(pairs)):
+            reply = json.loads(await reader.readline())
+            if 'error' in reply:
+                raise ValueError(reply['error'])
+            answers[reply['id']] = reply['path']
+        return answers
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def serve(graph, host, port, useProcesses = True):
+    server = GraphServer(graph, host, port, useProcesses)
+    await server.start()
+    print('Serving shortest paths on', server.host + ':' + str(server.port))
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Answer shortest-path queries over a socket')
+    parser.add_argument('edgeList', help = 'edge-list file with the graph')
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8765)
+    parser.add_argument('--threads', action = 'store_true', help = 'search on threads')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(loadEdgeList(args.edgeList), args.host, args.port, not args.threads))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,164 @@
+# Saving a graph to a binary snapshot file and opening it again through mmap
+
+# Building a large `Digraph` from its source data (see `graph_loader.py`) has to parse every line
+# and grow Python lists one edge at a time. A snapshot stores the frozen CSR form of the graph (see
+# `graph_csr.py`) exactly as it sits in memory, so loading it is:
+
+# * decode the node names (one `Node` per node, unavoidable since searches work on nodes)
+# * map the file read-only with `mmap` and point `offsets`, `targets` and `weights` straight at the
+#   mapped bytes with `memoryview.cast`: nothing is parsed or copied
+
+# Because the mapping is read-only and shared, any number of processes that open the same snapshot
+# use the same physical pages for the arrays. For a directed graph the snapshot also holds the
+# reverse adjacency (every edge turned around, see `reverseOf` in `graph_csr.py`) that `parentsOf`
+# needs, so no process has to build its own copy of it.
+
+# File layout (little-endian, every section starts at a multiple of 8 bytes):
+
+#     header       magic b'DGSNAP01', numNodes, numEdges, namesSize (3 x uint64), flags (uint32)
+#     nameOffsets  numNodes + 1 x int64, where each name starts in the names section
+#     names        the node names, UTF-8, one after the other
+#     offsets      numNodes + 1 x int32
+#     targets      numEdges x int32
+#     weights      numEdges x float64 (only if flags has WEIGHTED)
+#     the offsets, targets and weights of the reverse adjacency, laid out the same way (only if
+#     flags has REVERSED)
+
+from array import array
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from intro_graph_problems import Node
+from graph_csr import FrozenDigraph, freeze, reverseOf
+
+
+MAGIC = b'DGSNAP01'
+HEADER = struct.Struct('<8sQQQI4x')
+WEIGHTED = 1
+UNDIRECTED = 2
+REVERSED = 4
+
+
+def padding(size):
+    """Returns the number of bytes needed after size bytes to reach a multiple of 8"""
+    return -size % 8
+
+
+def snapshotSize(numNodes, numEdges, namesSize, flags):
+    """Returns the size in bytes of a snapshot with these header fields"""
+    def sectionSize(size):
+        return size + padding(size)
+    adjacencySize = sectionSize(4 * (numNodes + 1)) + sectionSize(4 * numEdges)
+    if flags & WEIGHTED:
+        adjacencySize += sectionSize(8 * numEdges)
+    size = HEADER.size + sectionSize(8 * (numNodes + 1)) + sectionSize(namesSize) + adjacencySize
+    if flags & REVERSED:
+        size += adjacencySize
+    return size
+
+
+def writeArray(f, values):
+    """Writes an array in little-endian order, followed by padding up to a multiple of 8 bytes"""
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    data = memoryview(values).cast('B')
+    f.write(data)
+    f.write(b'\0' * padding(len(data)))
+
+
+def writeAdjacency(f, graph):
+    """Writes the offsets, targets and (if any) weights of the FrozenDigraph graph"""
+    writeArray(f, array('i', graph.offsets))
+    writeArray(f, array('i', graph.targets))
+    if graph.weights is not None:
+        writeArray(f, array('d', graph.weights))
+
+
+def saveSnapshot(graph, fileName):
+    """Assumes graph is a Digraph, Graph or FrozenDigraph, fileName a path
+       Writes the snapshot of graph (see the top of this file) to fileName
+
+       The snapshot is written to a temporary file that then replaces fileName, so a process that
+       still has the old file mapped (graph may be one of them) keeps reading the old contents"""
+    if not isinstance(graph, FrozenDigraph):
+        graph = freeze(graph)
+
+    nameOffsets = array('q', [0])
+    names = bytearray()
+    for node in graph.nodes:
+        names += node.getName().encode('utf-8')
+        nameOffsets.append(len(names))
+
+    flags = 0
+    if graph.weights is not None:
+        flags |= WEIGHTED
+    if graph.undirected:
+        flags |= UNDIRECTED
+    else:
+        flags |= REVERSED
+        if graph.reverse is None:
+            graph.reverse = reverseOf(graph)
+
+    handle, tempName = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(fileName)))
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(graph.nodes), len(graph.targets), len(names), flags))
+            writeArray(f, nameOffsets)
+            f.write(names)
+            f.write(b'\0' * padding(len(names)))
+            writeAdjacency(f, graph)
+            if flags & REVERSED:
+                writeAdjacency(f, graph.reverse)
+            f.flush()
+        os.replace(tempName, fileName)
+    except BaseException:
+        os.remove(tempName)
+        raise
+
+
+def loadSnapshot(fileName):
+    """Assumes fileName is a snapshot written by saveSnapshot
+       Returns a FrozenDigraph whose offsets, targets and weights are read-only memoryviews of the
+       memory-mapped file (the mapping stays open for as long as the graph uses it)"""
+    with open(fileName, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+    if len(mm) < HEADER.size or HEADER.unpack_from(mm, 0)[0] != MAGIC:
+        mm.close()
+        raise ValueError('Not a graph snapshot: ' + fileName)
+    magic, numNodes, numEdges, namesSize, flags = HEADER.unpack_from(mm, 0)
+    if len(mm) < snapshotSize(numNodes, numEdges, namesSize, flags):
+        mm.close()
+        raise ValueError('Truncated graph snapshot: ' + fileName)
+
+    data = memoryview(mm)
+    position = HEADER.size
+    def section(typecode, count):
+        nonlocal position
+        itemSize = array(typecode).itemsize
+        view = data[position:position + count * itemSize].cast(typecode)
+        position += count * itemSize + padding(count * itemSize)
+        if sys.byteorder != 'little': #the file is little-endian: fall back to a swapped copy
+            view = array(typecode, view)
+            view.byteswap()
+        return view
+
+    nameOffsets = section('q', numNodes + 1)
+    names = data[position:position + namesSize]
+    position += namesSize + padding(namesSize)
+    nodes = []
+    for i in range(numNodes):
+        nodes.append(Node(str(names[nameOffsets[i]:nameOffsets[i + 1]], 'utf-8')))
+    def adjacency():
+        offsets = section('i', numNodes + 1)
+        targets = section('i', numEdges)
+        weights = section('d', numEdges) if flags & WEIGHTED else None
+        return FrozenDigraph(nodes, offsets, targets, weights, bool(flags & UNDIRECTED))
+
+    graph = adjacency()
+    if flags & REVERSED:
+        graph.reverse = adjacency()
+    return graph
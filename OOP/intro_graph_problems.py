@@ -1,7 +1,39 @@
+from collections import deque
+import heapq
+import io
+import itertools
+import time
+import weakref
+
+
 class Node(object):
+    # Nodes are interned: Node(name) returns the node that already has that name (if one is still
+    # in use), so two nodes with the same name are the same object. That is what makes the default
+    # equality and hashing (by identity, done in C) the same as equality by name, with no __eq__ or
+    # __hash__ written in Python slowing down every dict and set operation of a search. (Each
+    # subclass interns its own nodes, so a node of a subclass is never equal to a Node.)
+    # __slots__ replaces the per-instance __dict__ (the same for Edge and WeightedEdge below).
+    # The intern table holds a weak reference per node, which costs more memory than the slots
+    # save on a node: a node takes about twice the memory of the original __dict__ one. Edges are
+    # much smaller, though, so a graph with more than about 2-3 edges per node takes less memory
+    # overall (see graph_memory_benchmark.py).
+    __slots__ = ('name', '__weakref__')
+    interned = weakref.WeakValueDictionary() #maps a name to the node with that name
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.interned = weakref.WeakValueDictionary() #each subclass interns its own nodes
+    def __new__(cls, name):
+        node = cls.interned.get(name)
+        if node is None:
+            node = object.__new__(cls)
+            node.name = name
+            cls.interned[name] = node
+        return node
     def __init__(self, name):
         """Assumes name is a string"""
         self.name = name
+    def __getnewargs__(self):
+        return (self.name,) #so unpickling goes through __new__ and is interned too
     def getName(self):
         return self.name
     def __str__(self):
@@ -9,6 +41,7 @@ class Node(object):
 
 
 class Edge(object):
+    __slots__ = ('src', 'dest')
     def __init__(self, src, dest):
         """Assumes src and dest are nodes"""
         self.src = src
@@ -22,10 +55,10 @@ class Edge(object):
 
 
 class WeightedEdge(Edge):
+    __slots__ = ('weight',)
     def __init__(self, src, dest, weight = 1.0):
         """Assumes src and dest are nodes, weight a number"""
-        self.src = src
-        self.dest = dest
+        Edge.__init__(self, src, dest)
         self.weight = weight
     def getWeight(self):
         return self.weight
@@ -36,59 +69,245 @@ class WeightedEdge(Edge):
 # ..................................................................................................
 
 class Digraph(object):
-    #nodes is a list of the nodes in the graph
-    #edges is a dict mapping each node to a list of its children
-    def __init__(self):
-        self.nodes = []
+    #nodes is a dict whose keys are the nodes in the graph (a dict keeps them in the order they were
+    #added, like a list, but a node can be found and removed in O(1))
+    #edges is a dict mapping each node to a dict that maps each of its children to the weight of
+    #the edge (an unweighted Edge counts as weight 1.0). Adding the same edge again keeps the lighter
+    #of the two weights, so a lowest-weight search finds the same paths as with both edges.
+    #membership is checked against the keys of edges (a hash lookup), not by scanning nodes
+    #reverseEdges is a dict mapping each node to a dict of its parents (the nodes with an edge to
+    #it) and the weights of those edges, so a search can also walk the graph backwards
+    #version goes up by one every time the graph changes, so saved results can tell they are stale
+    #changes is the change log: the latest changes, oldest first, each a tuple
+    #(version, 'addNode', node), (version, 'addEdge', src, dest, weight),
+    #(version, 'removeEdge', src, dest) or (version, 'removeNode', node)
+    #subscribers is a list of functions, each called with every change as it happens
+    def __init__(self, logSize = 1024):
+        self.nodes = {}
         self.edges = {}
+        self.reverseEdges = {}
+        self.version = 0
+        self.changes = deque(maxlen = logSize)
+        self.subscribers = []
     def addNode(self, node):
-        if node in self.nodes:
+        if node in self.edges:
             raise ValueError('Duplicate node')
         else:
-            self.nodes.append(node)
-            self.edges[node] = []
+            self.nodes[node] = None
+            self.edges[node] = {}
+            if self.reverseEdges is not None:
+                self.reverseEdges[node] = {}
+            self.recordChange('addNode', node)
     def addEdge(self, edge):
-        src = edge.getSource()
-        dest = edge.getDestination()
-        if not (src in self.nodes and dest in self.nodes):
+        if isinstance(edge, WeightedEdge):
+            self.connect(edge.getSource(), edge.getDestination(), edge.getWeight())
+        else:
+            self.connect(edge.getSource(), edge.getDestination())
+    def connect(self, src, dest, weight = 1.0):
+        """Adds an edge from node src to node dest without needing an Edge object"""
+        if not (src in self.edges and dest in self.edges):
+            raise ValueError('Node not in graph')
+        if dest in self.edges[src]:
+            if weight >= self.edges[src][dest]:
+                return #a parallel edge no lighter than the one stored changes nothing
+        self.edges[src][dest] = weight
+        if self.reverseEdges is not None:
+            self.reverseEdges[dest][src] = weight
+        self.recordChange('addEdge', src, dest, weight)
+    def removeEdge(self, edge):
+        self.disconnect(edge.getSource(), edge.getDestination())
+    def disconnect(self, src, dest):
+        """Removes the edge from node src to node dest, in O(1)"""
+        if not (src in self.edges and dest in self.edges[src]):
+            raise ValueError('Edge not in graph')
+        del self.edges[src][dest]
+        if self.reverseEdges is not None:
+            del self.reverseEdges[dest][src]
+        self.recordChange('removeEdge', src, dest)
+    def removeNode(self, node):
+        """Removes node and every edge to or from it, in O(number of those edges)"""
+        if node not in self.edges:
             raise ValueError('Node not in graph')
-        self.edges[src].append(dest)
+        for child in list(self.edges[node]):
+            self.disconnect(node, child)
+        for parent in list(self.parentsOf(node)):
+            self.disconnect(parent, node)
+        del self.nodes[node]
+        del self.edges[node]
+        if self.reverseEdges is not None:
+            del self.reverseEdges[node]
+        self.recordChange('removeNode', node)
+    def recordChange(self, *change):
+        self.version += 1
+        change = (self.version,) + change
+        self.changes.append(change)
+        for subscriber in self.subscribers:
+            subscriber(change)
+    def subscribe(self, subscriber):
+        """subscriber is a function that will be called with each change (see changes above)"""
+        self.subscribers.append(subscriber)
+    def unsubscribe(self, subscriber):
+        self.subscribers.remove(subscriber)
+    def changesSince(self, version):
+        """Returns the list of changes made after version, oldest first, or None if the change log
+        no longer goes back that far (then anything saved at version has to be rebuilt)"""
+        if version == self.version:
+            return []
+        if len(self.changes) == 0 or self.changes[0][0] > version + 1:
+            return None
+        return [change for change in self.changes if change[0] > version]
     def childrenOf(self, node):
-        return self.edges[node]
+        return self.edges[node].keys()
+    def parentsOf(self, node):
+        return self.reverseEdges[node].keys()
+    def weightedChildrenOf(self, node):
+        """Returns an iterator of (child, weight) pairs"""
+        return iter(self.edges[node].items())
     def hasNode(self, node):
-        return node in self.nodes
+        return node in self.edges
     def __str__(self):
-        result = ''
-        for src in self.nodes:
-            for dest in self.edges[src]:
-                result = result + src.getName() + '->'\
-                         + dest.getName() + '\n'
-        return result[:-1] #omit final newline
+        out = io.StringIO()
+        writeGraph(self, out) #one 'src->dest' line per edge, without a final newline
+        return out.getvalue()
 
 
 class Graph(Digraph):
     # Graph is a subclass of Digraph
-    # It inherits all of the methods of `Digraph` except `addEdge`, which it overrides.
-    def addEdge(self, edge):
-        Digraph.addEdge(self, edge)
-        rev = Edge(edge.getDestination(), edge.getSource())
-        Digraph.addEdge(self, rev)
+    # It inherits all of the methods of `Digraph` except `__init__`, `connect`, `disconnect` and
+    # `parentsOf`, which it overrides: `connect` and `disconnect` (which `addEdge` and `removeEdge`
+    # call) add (remove) the edge in both directions. Since every edge is stored in both
+    # directions, the parents of a node are its children: `__init__` sets reverseEdges to None and
+    # `parentsOf` just returns the children.
+    def __init__(self, logSize = 1024):
+        Digraph.__init__(self, logSize)
+        self.reverseEdges = None
+    def connect(self, src, dest, weight = 1.0):
+        Digraph.connect(self, src, dest, weight)
+        Digraph.connect(self, dest, src, weight)
+    def disconnect(self, src, dest):
+        Digraph.disconnect(self, src, dest)
+        if dest != src: #an edge from a node to itself is stored only once
+            Digraph.disconnect(self, dest, src)
+    def parentsOf(self, node):
+        return self.edges[node].keys()
 
 # ..................................................................................................
+# Search observers
+
+# Every search below can report what it is doing to an observer: an object with the four methods
+# of `SearchObserver`. With no observer (the default) a search pays for nothing but an
+# `observer is not None` test per step. `toPrint = True` means "also use a `PathPrinter`", which
+# prints the current path at every step, as the searches always did.
+
+class SearchObserver(object):
+    # Does nothing: subclasses override the methods they need.
+    def searchStarted(self, search, start, end):
+        """search is the name of the search ('DFS', 'BFS', ...); start and end are nodes"""
+        pass
+    def nodeExpanded(self, node, frontierSize, getPath):
+        """Called when the search looks at the children of node. frontierSize is the number of
+        nodes (or paths) waiting to be looked at (for iterDFS, the children on its stack not yet
+        looked at; the recursive DFS keeps those in Python's call stack, where they cannot be
+        counted, so it gives the length of the current path instead), getPath a function of no
+        arguments that returns the current path (building it costs time, so it is only done if
+        asked for)"""
+        pass
+    def branchPruned(self, node):
+        """Called when the search decides not to go on to node (already reached, already on the
+        path, or the path would be too long)"""
+        pass
+    def searchFinished(self, path, elapsed):
+        """path is what the search returns, elapsed the time it took in seconds"""
+        pass
+
+
+class SearchCounter(SearchObserver):
+    # Adds up what it is told, over every search it observes.
+    def __init__(self):
+        self.searches = 0
+        self.expanded = 0
+        self.pruned = 0
+        self.maxFrontier = 0
+        self.elapsed = 0.0
+    def searchStarted(self, search, start, end):
+        self.searches += 1
+    def nodeExpanded(self, node, frontierSize, getPath):
+        self.expanded += 1
+        if frontierSize > self.maxFrontier:
+            self.maxFrontier = frontierSize
+    def branchPruned(self, node):
+        self.pruned += 1
+    def searchFinished(self, path, elapsed):
+        self.elapsed += elapsed
+    def report(self):
+        return {'searches': self.searches, 'expanded': self.expanded, 'pruned': self.pruned,
+                'maxFrontier': self.maxFrontier, 'elapsed': self.elapsed}
 
-def DFS(graph, start, end, path, shortest, toPrint = False):
+
+class PathPrinter(SearchObserver):
+    # Prints 'Current <search> path: ...' every time a node is expanded (what toPrint does).
+    def __init__(self, search):
+        self.search = search
+    def nodeExpanded(self, node, frontierSize, getPath):
+        print('Current ' + self.search + ' path:', printPath(getPath()))
+
+
+class ObserverGroup(SearchObserver):
+    # Passes everything on to each observer in a list.
+    def __init__(self, observers):
+        self.observers = observers
+    def searchStarted(self, search, start, end):
+        for observer in self.observers:
+            observer.searchStarted(search, start, end)
+    def nodeExpanded(self, node, frontierSize, getPath):
+        for observer in self.observers:
+            observer.nodeExpanded(node, frontierSize, getPath)
+    def branchPruned(self, node):
+        for observer in self.observers:
+            observer.branchPruned(node)
+    def searchFinished(self, path, elapsed):
+        for observer in self.observers:
+            observer.searchFinished(path, elapsed)
+
+
+def chooseObserver(observer, toPrint, search):
+    """Returns the observer a search should report to: observer, plus a PathPrinter if toPrint is
+       True (None if there is nothing to report to)"""
+    if not toPrint:
+        return observer
+    if observer is None:
+        return PathPrinter(search)
+    return ObserverGroup([PathPrinter(search), observer])
+
+def observedSearch(observer, search, start, end, run):
+    """Calls run (a function of no arguments that runs a search) between observer.searchStarted and
+       observer.searchFinished
+       Returns what run returns"""
+    observer.searchStarted(search, start, end)
+    began = time.perf_counter()
+    path = run()
+    observer.searchFinished(path, time.perf_counter() - began)
+    return path
+
+# ..................................................................................................
+
+def DFS(graph, start, end, path, shortest, toPrint = False, observer = None):
     """
     DEPTH-FIRST SEARCH: FIND THE SHORTEST PATH FROM START TO END IN GRAPH
         graph is a Digraph object
         start and end are Node objects
         path is a list of nodes
+        observer is None or a SearchObserver (this recursive version only reports expanded and
+        pruned nodes, with the length of the path as frontierSize; shortestPath reports the whole
+        search)
     Returns: shortest, a list of nodes
     (note that it requires an initial "shortest" to be passed)
     """
     path = path + [start]
+    observer = chooseObserver(observer, toPrint, 'DFS')
     
-    if toPrint:
-        print('Current DFS path:', printPath(path))
+    if observer is not None:
+        observer.nodeExpanded(start, len(path), lambda: path)
     
     if start == end:
         return path
@@ -96,38 +315,289 @@ def DFS(graph, start, end, path, shortest, toPrint = False):
     for node in graph.childrenOf(start):
         if node not in path: #avoid cycles
             if shortest == None or len(path) < len(shortest):
-                newPath = DFS(graph, node, end, path, shortest, toPrint)
+                newPath = DFS(graph, node, end, path, shortest, False, observer)
                 if newPath != None:
                     shortest = newPath
+            elif observer is not None:
+                observer.branchPruned(node)
+        elif observer is not None:
+            observer.branchPruned(node)
     
     return shortest
 
 # ..................................................................................................
 
-def shortestPath(graph, start, end, toPrint = False):
+def iterDFS(graph, start, end, shortest = None, toPrint = False, maxDepth = None,
+            observer = None):
     """
-    shortestPath is a wrapper for the DFS function
+    DEPTH-FIRST SEARCH WITHOUT RECURSION
+        graph is a Digraph object
+        start and end are Node objects
+        shortest is None or a path that has already been found
+        maxDepth is None or the largest number of edges a path may have
+        observer is None or a SearchObserver
+    Returns: the same path DFS(graph, start, end, [], shortest, toPrint) returns (or None)
+    """
+    observer = chooseObserver(observer, toPrint, 'DFS')
+    if observer is None:
+        return boundedDFS(graph, start, end, shortest, maxDepth, None)[0]
+    return observedSearch(observer, 'DFS', start, end,
+                          lambda: boundedDFS(graph, start, end, shortest, maxDepth, observer)[0])
+
+def boundedDFS(graph, start, end, shortest, maxDepth, observer):
+    """
+    The engine behind iterDFS. Instead of recursing, it keeps an explicit stack with one iterator
+    over the children of each node on the current path. The path is extended and shortened in
+    place (push/pop) and onPath, a set, replaces the `node not in path` scan.
+    Returns: a tuple (shortest, cutOff); cutOff is True if maxDepth stopped some path from being
+    explored
+    """
+    path = [start]
+    onPath = {start}
+    cutOff = False
+    pending = 0 #the children on the stack not looked at yet (only counted for the observer)
+    
+    if start == end:
+        if observer is not None:
+            observer.nodeExpanded(start, pending, lambda: path[:])
+        return path, cutOff
+    
+    children = graph.childrenOf(start)
+    if observer is not None:
+        pending = len(children)
+        observer.nodeExpanded(start, pending, lambda: path[:])
+    stack = [iter(children)]
+    
+    while stack:
+        node = next(stack[-1], None)
+        
+        if node is None: #all children explored, step back
+            stack.pop()
+            onPath.discard(path.pop())
+            continue
+        
+        if observer is not None:
+            pending -= 1
+        
+        # avoid cycles, and branch and bound: same tests as in DFS, a path is only extended while
+        # it is shorter than the best one found so far
+        if node in onPath or (shortest != None and len(path) >= len(shortest)):
+            if observer is not None:
+                observer.branchPruned(node)
+            continue
+        
+        if maxDepth != None and len(path) > maxDepth:
+            cutOff = True
+            if observer is not None:
+                observer.branchPruned(node)
+            continue
+        
+        path.append(node)
+        
+        if node == end:
+            if observer is not None:
+                observer.nodeExpanded(node, pending, lambda: path[:])
+            shortest = path[:] #the only copy made: when a better path is found
+            path.pop()
+        else:
+            children = graph.childrenOf(node)
+            if observer is not None:
+                pending += len(children)
+                observer.nodeExpanded(node, pending, lambda: path[:])
+            onPath.add(node)
+            stack.append(iter(children))
+    
+    return shortest, cutOff
+
+def shortestPath(graph, start, end, toPrint = False, maxDepth = None,
+                 iterativeDeepening = False, observer = None):
+    """
+    shortestPath is a wrapper for the depth-first search (now iterDFS, which returns the same path
+    as DFS but has no recursion limit)
         graph is a Digraph object
         start and end are Node objects
         toPrint is a boolean that says whether to print or not?
+        maxDepth is None or the largest number of edges the path may have
+        iterativeDeepening is a boolean; if True, the search is run with maxDepth = 0, 1, 2, ...
+        and stops at the first depth that has a path (or that cuts nothing off), so long paths are
+        never explored before short ones
+        observer is None or a SearchObserver
+    """
+    if not iterativeDeepening:
+        return iterDFS(graph, start, end, None, toPrint, maxDepth, observer)
+    
+    observer = chooseObserver(observer, toPrint, 'DFS')
+    
+    def deepen():
+        depth = 0
+        while maxDepth == None or depth <= maxDepth:
+            shortest, cutOff = boundedDFS(graph, start, end, None, depth, observer)
+            if shortest != None or not cutOff:
+                return shortest
+            depth += 1
+        return None
+    
+    if observer is None:
+        return deepen()
+    return observedSearch(observer, 'DFS', start, end, deepen)
+
+def dijkstra(graph, start, end, toPrint = False, observer = None):
+    """
+    DIJKSTRA'S ALGORITHM: FIND THE PATH OF LOWEST TOTAL WEIGHT FROM START TO END IN GRAPH
+        graph is a Digraph object whose edges have weights >= 0
+        start and end are Node objects
+        observer is None or a SearchObserver
+    Returns: a list of nodes (or None if end can not be reached)
     """
-    return DFS(graph, start, end, [], None, toPrint)
+    return aStar(graph, start, end, None, toPrint, observer)
+
+def aStar(graph, start, end, heuristic = None, toPrint = False, observer = None):
+    """
+    A* SEARCH: DIJKSTRA'S ALGORITHM GUIDED BY AN ESTIMATE OF THE DISTANCE LEFT
+        graph is a Digraph object whose edges have weights >= 0
+        start and end are Node objects
+        heuristic is None (plain Dijkstra) or a function from a node to an estimate of the weight
+        of the lightest path from that node to end. For the result to be a lowest-weight path the
+        estimate must never be larger than the real weight, and must not drop by more than the
+        weight of an edge when following that edge (a "consistent" heuristic)
+        observer is None or a SearchObserver
+    Returns: a list of nodes (or None if end can not be reached)
+    
+    The frontier is a heap of (estimated total weight, tie breaker, node), so every step costs
+    O(log V) and the whole search O((V+E) log V). A node can be pushed more than once; only its
+    first (lightest) pop is expanded.
+    """
+    search = 'Dijkstra' if heuristic == None else 'A*'
+    observer = chooseObserver(observer, toPrint, search)
+    if observer is None:
+        return weightedSearch(graph, start, end, heuristic, None)
+    return observedSearch(observer, search, start, end,
+                          lambda: weightedSearch(graph, start, end, heuristic, observer))
+
+def weightedSearch(graph, start, end, heuristic, observer):
+    """The engine behind aStar (and dijkstra)"""
+    if heuristic == None:
+        heuristic = lambda node: 0
+    
+    costs = {start: 0}
+    parents = {start: None}
+    done = set()
+    counter = itertools.count() #nodes can not be compared, so ties are broken by push order
+    frontier = [(heuristic(start), next(counter), start)]
+    
+    while frontier:
+        node = heapq.heappop(frontier)[2]
+        if node in done:
+            continue
+        done.add(node)
+        
+        if observer is not None:
+            observer.nodeExpanded(node, len(frontier), lambda: pathTo(parents, node))
+        
+        if node == end:
+            return pathTo(parents, end)
+        
+        cost = costs[node]
+        for child, weight in graph.weightedChildrenOf(node):
+            if weight < 0:
+                raise ValueError('Negative edge weight')
+            newCost = cost + weight
+            if child not in costs or newCost < costs[child]:
+                costs[child] = newCost
+                parents[child] = node
+                heapq.heappush(frontier, (newCost + heuristic(child), next(counter), child))
+            elif observer is not None:
+                observer.branchPruned(child)
+    
+    return None
+
+def pathWeight(graph, path):
+    """Assumes path is a list of nodes, each one a child of the one before
+       Returns the total weight of path"""
+    total = 0
+    for i in range(len(path) - 1):
+        for child, weight in graph.weightedChildrenOf(path[i]):
+            if child == path[i + 1]:
+                total += weight
+                break
+    return total
 
 def printPath(path):
     """Assumes path is a list of nodes"""
-    result = ''
-    for i in range(len(path)):
-        result = result + str( path[i] )
-        if i != len(path) - 1:
-            result = result + '->'
-    return result 
+    out = io.StringIO()
+    writePath(path, out)
+    return out.getvalue()
+
+# ..................................................................................................
+# Streaming writers
+
+# Building a long string with `result = result + ...` copies everything written so far on every
+# step (quadratic time), and the whole text has to be in memory before any of it can be used. The
+# functions below produce the text piece by piece instead and hand it to `out` (any object with a
+# `write` method: a file, `sys.stdout`, an `io.StringIO`...) in chunks of `chunkSize` pieces.
+
+def edgeLines(graph):
+    """Assumes graph is a Digraph (or anything with nodes and childrenOf)
+       Yields one 'src->dest' string per edge, in the order of Digraph.__str__"""
+    for src in graph.nodes:
+        srcName = src.getName()
+        for dest in graph.childrenOf(src):
+            yield srcName + '->' + dest.getName()
+
+def writeGraph(graph, out, chunkSize = 4096):
+    """Writes the edges of graph to out, one per line, with no newline after the last one
+       (the same text as str(graph))"""
+    writeChunks(edgeLines(graph), '\n', out, chunkSize)
+
+def writePath(path, out, chunkSize = 4096):
+    """Assumes path is a list (or any iterable) of nodes
+       Writes the same text as printPath(path) to out"""
+    writeChunks((str(node) for node in path), '->', out, chunkSize)
+
+def writeChunks(pieces, separator, out, chunkSize):
+    """Writes the strings in pieces to out, separated by separator, joining chunkSize pieces at a
+       time so out.write is called once per chunk"""
+    chunk = []
+    first = True
+    for piece in pieces:
+        chunk.append(piece)
+        if len(chunk) == chunkSize:
+            out.write(('' if first else separator) + separator.join(chunk))
+            first = False
+            chunk = []
+    if chunk:
+        out.write(('' if first else separator) + separator.join(chunk))
 
 # ..................................................................................................
 
 #Figure 12.11 (with a bug fixed)
-def BFS(graph, start, end, toPrint = False):
+def BFS(graph, start, end, toPrint = False, mode = 'parents', observer = None):
     """Assumes graph is a Digraph; start and end are nodes
+       mode is 'parents' (the default, linear time), 'paths' (the textbook version below) or
+       'bidirectional' (searches from both ends at once; the path is a shortest one, but when
+       there are several it may not be the one the other modes return)
+       observer is None or a SearchObserver
+       Returns a shortest path from start to end in graph"""
+    if mode == 'parents':
+        search = parentBFS
+    elif mode == 'paths':
+        search = pathBFS
+    elif mode == 'bidirectional':
+        search = bidirectionalBFS
+    else:
+        raise ValueError('Unknown BFS mode: ' + str(mode))
+    
+    observer = chooseObserver(observer, toPrint, 'BFS')
+    if observer is None:
+        return search(graph, start, end)
+    return observedSearch(observer, 'BFS', start, end,
+                          lambda: search(graph, start, end, False, observer))
+
+def pathBFS(graph, start, end, toPrint = False, observer = None):
+    """The textbook BFS: keeps a queue of whole paths
+       Assumes graph is a Digraph; start and end are nodes
        Returns a shortest path from start to end in graph"""
+    observer = chooseObserver(observer, toPrint, 'BFS')
 
     initPath = [start] # a list with a node object (start)
     pathQueue = [initPath] # a list with a list inside
@@ -138,9 +608,9 @@ def BFS(graph, start, end, toPrint = False):
         # `pop([i])`: removes the item with the index i from the array and returns it
         tmpPath = pathQueue.pop(0)
         
-        if toPrint:
-            print('Current BFS path:', printPath(tmpPath))
         lastNode = tmpPath[-1]
+        if observer is not None:
+            observer.nodeExpanded(lastNode, len(pathQueue), lambda: tmpPath)
         
         if lastNode == end:
             return tmpPath
@@ -149,9 +619,134 @@ def BFS(graph, start, end, toPrint = False):
             if nextNode not in tmpPath:
                 newPath = tmpPath + [nextNode]
                 pathQueue.append(newPath)
+            elif observer is not None:
+                observer.branchPruned(nextNode)
     
     return None
 
+def parentBFS(graph, start, end, toPrint = False, observer = None):
+    """BFS in O(V+E): keeps a queue of nodes and remembers, for each node, the node it was first
+       reached from (its parent). The path is rebuilt from the parents once, at the end.
+       Assumes graph is a Digraph; start and end are nodes
+       Returns the same shortest path as pathBFS (or None if there is no path)"""
+    observer = chooseObserver(observer, toPrint, 'BFS')
+
+    # A node is marked as visited when it is put in the queue, so every node is queued (and every
+    # edge looked at) at most once. Its parent is the first node, in queue order, that reaches it,
+    # which is also the node before it on the first path pathBFS would find.
+    parents = {start: None}
+    nodeQueue = deque([start])
+
+    while nodeQueue:
+        
+        lastNode = nodeQueue.popleft()
+        
+        if observer is not None:
+            observer.nodeExpanded(lastNode, len(nodeQueue), lambda: pathTo(parents, lastNode))
+        
+        if lastNode == end:
+            return pathTo(parents, end)
+        
+        for nextNode in graph.childrenOf(lastNode):
+            if nextNode not in parents:
+                parents[nextNode] = lastNode
+                nodeQueue.append(nextNode)
+            elif observer is not None:
+                observer.branchPruned(nextNode)
+    
+    return None
+
+def bidirectionalBFS(graph, start, end, toPrint = False, observer = None):
+    """BFS from both ends: forwards from start (childrenOf) and backwards from end (parentsOf),
+       one whole level at a time, always growing the side with the smaller frontier. The search
+       stops at the first level where the two sides meet. If a one-sided BFS has to look at about
+       b^d nodes (b children per node, a path of d edges) this looks at about 2*b^(d/2).
+       Assumes graph is a Digraph (or Graph); start and end are nodes
+       Returns a shortest path from start to end in graph (or None)"""
+    observer = chooseObserver(observer, toPrint, 'BFS')
+    if start == end:
+        if observer is not None:
+            observer.nodeExpanded(start, 0, lambda: [start])
+        return [start]
+    
+    # for each side: the parent of every node reached (towards start, or towards end) and the
+    # distance of every node reached from start (or to end)
+    forwardParents, forwardDists, forwardFrontier = {start: None}, {start: 0}, [start]
+    backwardParents, backwardDists, backwardFrontier = {end: None}, {end: 0}, [end]
+    
+    while forwardFrontier and backwardFrontier:
+        
+        if len(forwardFrontier) <= len(backwardFrontier):
+            forwardFrontier, meet = expandLevel(graph.childrenOf, forwardFrontier, forwardParents,
+                                                forwardDists, backwardDists, observer, True)
+        else:
+            backwardFrontier, meet = expandLevel(graph.parentsOf, backwardFrontier,
+                                                 backwardParents, backwardDists, forwardDists,
+                                                 observer, False)
+        
+        if meet is not None:
+            path = pathTo(forwardParents, meet)
+            node = backwardParents[meet]
+            while node is not None:
+                path.append(node)
+                node = backwardParents[node]
+            return path
+    
+    return None
+
+def expandLevel(neighboursOf, frontier, parents, dists, otherDists, observer, forward):
+    """Expands every node of frontier (one level of a bidirectional BFS); forward is False for the
+       side that starts at end (its paths are reported to observer in the start-to-end direction)
+       Returns a tuple (nextFrontier, meet); meet is None or, among the nodes reached by both
+       sides in this level, the one on the shortest path"""
+    nextFrontier = []
+    meet = None
+    best = None
+    for i in range(len(frontier)):
+        node = frontier[i]
+        if observer is not None:
+            if forward:
+                getPath = lambda: pathTo(parents, node)
+            else:
+                getPath = lambda: pathTo(parents, node)[::-1]
+            observer.nodeExpanded(node, len(frontier) - i - 1 + len(nextFrontier), getPath)
+        for nextNode in neighboursOf(node):
+            if nextNode not in parents:
+                parents[nextNode] = node
+                dists[nextNode] = dists[node] + 1
+                nextFrontier.append(nextNode)
+                if nextNode in otherDists:
+                    length = dists[nextNode] + otherDists[nextNode]
+                    if best is None or length < best:
+                        meet, best = nextNode, length
+            elif observer is not None:
+                observer.branchPruned(nextNode)
+    return nextFrontier, meet
+
+def BFSTree(graph, start):
+    """Assumes graph is a Digraph; start is a node
+       Returns a dict mapping every node that can be reached from start to its parent (None for
+       start), the same parents parentBFS uses, so pathTo(tree, end) == BFS(graph, start, end)"""
+    parents = {start: None}
+    nodeQueue = deque([start])
+    while nodeQueue:
+        lastNode = nodeQueue.popleft()
+        for nextNode in graph.childrenOf(lastNode):
+            if nextNode not in parents:
+                parents[nextNode] = lastNode
+                nodeQueue.append(nextNode)
+    return parents
+
+def pathTo(parents, node):
+    """Assumes parents is a dict mapping each reached node to its parent (None for the start node)
+       Returns the list of nodes from the start node to node"""
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    return path
+
 # ..................................................................................................
 # Run a depth-first search
 
@@ -225,6 +820,7 @@ def testSP():
 
 # * `Node` is a type
 #     - requires input `name` (a string)
+#     - nodes are interned by name: `Node('a') is Node('a')`
 # 
 # * `Edge` is a type
 #     - requires inputs `src` and `dest` (Node objects)
@@ -234,12 +830,21 @@ def testSP():
 #     - requires inputs `src`, `dest` (Node objects), and `weight` (a float from 0 to 1.0)
 # 
 # * `Digraph` is a type which requires (creates?)
-#     - `nodes`, a list of Node objects
-#     - `edges`, a dictionary mapping each node to a list of its children
+#     - `nodes`, a dictionary whose keys are the Node objects (in the order they were added)
+#     - `edges`, a dictionary mapping each node to a dictionary of its children and the weights of
+#       the edges to them
+#     - `reverseEdges`, a dictionary mapping each node to a dictionary of its parents (`None` in a
+#       `Graph`, where `parentsOf` returns the children)
+#     - `version`, `changes` and `subscribers`: a counter of changes, a log of the latest ones and
+#       the functions to tell about each new one (`removeNode`/`removeEdge` are logged too)
 #       
 # * `Graph` is a subtype of `Digraph`
-#     - class `Graph` inherits all the methods of `Digraph` except `addEdge`, which it overrides
-#     - `addEdge` creates `rev` (an Edge object)
+#     - class `Graph` inherits all the methods of `Digraph` except `__init__`, `connect`,
+#       `disconnect` and `parentsOf`, which it overrides
+#     - `__init__` keeps no `reverseEdges` (every edge goes both ways, so the parents of a node are
+#       its children, which is what `parentsOf` returns)
+#     - `connect` (called by `addEdge`) adds the edge in both directions with the same weight, and
+#       `disconnect` (called by `removeEdge`) removes both
 #     - requires input `edge` (Edge type objects)
 
 ## Functions
@@ -252,10 +857,26 @@ def testSP():
 # 
 # 
 # * `DFS` is a function
-# * `BFS` is a function
-# * `shortestPath` is a wrapper for the `DFS` function. It serves to get the recursion started
-#   properly and provide appropriate abstraction. It does that by indicating that
-#     - the current path being explored is empty (`path == []`)
-#     - no path from `start` to `end` has yet been found (`shortest == None`)
+# * `BFS` is a function. It dispatches on `mode` to one of
+#     - `parentBFS` (the default): a queue of nodes plus a dict of parents, O(V+E)
+#     - `pathBFS`: the textbook version, a queue of whole paths (each one copied on every step)
+#     - `bidirectionalBFS`: grows a BFS from each end (`expandLevel` does one level) until they meet
+# * `BFSTree` runs a BFS to the end and returns the parents of every reachable node
+# * `pathTo` rebuilds a path from a dict of parents
+# * `iterDFS` returns the same path as `DFS` but uses an explicit stack instead of recursion
+#   (`boundedDFS` is the engine behind it)
+# * `shortestPath` is a wrapper for the depth-first search, now `iterDFS` (no recursion). It
+#   serves to start the search properly and provide appropriate abstraction: no path from `start`
+#   to `end` has yet been found (`shortest == None`), and it can limit the depth (`maxDepth`) or
+#   search with iterative deepening (`iterativeDeepening`)
+# * `SearchObserver` is the interface a search reports to (`observer`); `SearchCounter` adds up
+#   nodes expanded, branches pruned, the largest frontier and time taken; `PathPrinter` prints the
+#   current path (what `toPrint = True` does); `ObserverGroup` passes reports on to several
+#   observers
+# * `dijkstra` and `aStar` find the path of lowest total weight (heap based, O((V+E) log V));
+#   `aStar` takes a `heuristic` function that estimates the weight left from a node to `end`
+# * `pathWeight` adds up the weights along a path
 # * `printPath` is a function used to convert the result of `sp`, a path, to a string that can be
 #   printed. (Remember the `path` variable is defined as a list of nodes.)
+# * `writeGraph` and `writePath` write the same text as `str(graph)` and `printPath(path)` to a file
+#   in chunks (`edgeLines` and `writeChunks` do the work), without building the whole string
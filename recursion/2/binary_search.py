@@ -0,0 +1,65 @@
+# Binary search without slicing
+
+# `isIn` of the session 10 exercises (`recursions_u2l4_CODE_part_2.py`) halves the string at every
+# step, but it does so with `aStr[:midIndex]` and `aStr[midIndex+1:]`: each step copies half of
+# what is left. The copies add up to about n characters, so the search costs O(n) and not
+# O(log n) — no better than looking at every character.
+
+# Two indices, `lo` and `hi`, can mark the part still to be searched instead: each step only moves
+# one of them. That works on anything that can be indexed: a str, a list, an `array`, a
+# `memoryview` (for bytes, the items are ints), never copying any of it.
+
+# * `bisectLeft(seq, x, lo, hi)`: the first position in seq[lo:hi] where x could be inserted
+#   keeping it sorted (the same as `bisect.bisect_left`)
+# * `isIn(item, seq)`: True if the sorted seq contains item. O(log n)
+# * `isInMany(items, seq)`: the answer for each of many items. The items are sorted, and then
+#   either each one is searched for only in the part of seq after the previous one, or (when there
+#   are so many items that this is cheaper) seq and the items are walked through side by side, as
+#   in the merge step of merge sort
+
+
+def bisectLeft(seq, x, lo = 0, hi = None):
+    """Assumes seq is sorted, 0 <= lo <= hi <= len(seq) (hi None: len(seq))
+       Returns the smallest i in lo..hi such that every item of seq[lo:i] is < x"""
+    if hi is None:
+        hi = len(seq)
+    while lo < hi:
+        middle = (lo + hi) // 2
+        if seq[middle] < x:
+            lo = middle + 1
+        else:
+            hi = middle
+    return lo
+
+
+def isIn(item, seq):
+    '''
+    item: the thing searched for (for a str, a single character)
+    seq: a sorted str, list, array or memoryview
+
+    returns: True if item is in seq; False otherwise
+    '''
+    i = bisectLeft(seq, item)
+    return i < len(seq) and seq[i] == item
+
+
+def isInMany(items, seq):
+    """Assumes items is an iterable, seq is sorted
+       Returns a list with isIn(item, seq) for each item in items, in the same order"""
+    items = list(items)
+    order = sorted(range(len(items)), key = lambda i: items[i])
+    answers = [False] * len(items)
+    n = len(seq)
+    # a search per item costs about log2(n) steps, a walk through seq costs n: pick the cheaper
+    if len(items) * max(n.bit_length(), 1) < n:
+        lo = 0
+        for i in order:
+            lo = bisectLeft(seq, items[i], lo)
+            answers[i] = lo < n and seq[lo] == items[i]
+    else:
+        j = 0
+        for i in order:
+            while j < n and seq[j] < items[i]:
+                j += 1
+            answers[i] = j < n and seq[j] == items[i]
+    return answers
@@ -0,0 +1,150 @@
+# Factorials of big numbers, binomial coefficients, and factorials modulo p
+
+# `fact`, `factorial` and `factorial_iter` of session 6 (`recursions_u2l4_CODE_part_1.py`)
+# multiply the answer by 2, then 3, then 4... The recursive two go one call deeper per factor and
+# hit the recursion limit near n = 1000 (and never stop for n = 0). The loop has no limit, but it
+# is slow for big n: each step multiplies an ever longer number by a small one, so the whole job
+# is O(n^2) in the length of the answer.
+
+# Multiplying numbers of similar size is much cheaper, because Python multiplies big ints with
+# Karatsuba's method. So `rangeProduct(lo, hi)` splits lo..hi in two halves, multiplies each half
+# the same way and then the two (similar-sized) results: a "product tree" or "binary splitting".
+# It recurses only log2(hi - lo) deep.
+
+# * `FactorialCache`: remembers the factorials it returned and starts each new one from the largest
+#   remembered factorial below it: with 1000! remembered, 1005! is five multiplications. It keeps
+#   at most `maxSize` of them and at most `maxBits` bits in all (1000000! alone is 18.5 million
+#   bits, 2.3 MB), dropping the least recently used first
+# * `factorial(n)`: n!, through a shared `FactorialCache` (8 MB at most)
+# * `binomial(n, k)`: "n choose k" = n! / (k! (n-k)!), computed as (n-k+1)...n / k! (without the
+#   shared cache, so binomials of big numbers do not fill it)
+# * `factorialsMod(ns, p)` and `binomialsMod(pairs, p)`: many answers modulo p at once (p prime
+#   for the binomials), from one table of factorials modulo p up to the largest n asked. These
+#   numbers never grow beyond p, so this is how combinatorics problems use them
+
+from collections import OrderedDict
+
+
+# Below this many factors, multiply one at a time: the numbers are still short
+LEAF_SIZE = 16
+
+
+def rangeProduct(lo, hi):
+    """Assumes lo, hi ints
+       Returns lo * (lo+1) * ... * hi (1 if hi < lo)"""
+    if hi - lo < LEAF_SIZE:
+        result = 1
+        for i in range(lo, hi + 1):
+            result *= i
+        return result
+    middle = (lo + hi) // 2
+    return rangeProduct(lo, middle) * rangeProduct(middle + 1, hi)
+
+
+class FactorialCache(object):
+    #results is an OrderedDict mapping n to n!, least recently used first
+    #bits is the total bit length of the factorials in results
+    def __init__(self, maxSize = 64, maxBits = 64 * 1024 * 1024):
+        """Assumes maxSize an int > 0 (the number of factorials kept), maxBits an int > 0 (the
+           most bits they may take in all; a factorial bigger than that is not kept)"""
+        if maxSize <= 0 or maxBits <= 0:
+            raise ValueError('maxSize and maxBits must be positive')
+        self.maxSize = maxSize
+        self.maxBits = maxBits
+        self.results = OrderedDict()
+        self.bits = 0
+        self.hits = 0
+        self.misses = 0
+    def clear(self):
+        self.results.clear()
+        self.bits = 0
+    def remember(self, n, result):
+        size = result.bit_length()
+        if size > self.maxBits:
+            return
+        self.results[n] = result
+        self.bits += size
+        while len(self.results) > self.maxSize or self.bits > self.maxBits:
+            self.bits -= self.results.popitem(last = False)[1].bit_length()
+    def factorial(self, n):
+        """Assumes n an int >= 0; returns n!"""
+        if n < 0:
+            raise ValueError('n must be >= 0')
+        if n in self.results:
+            self.hits += 1
+            self.results.move_to_end(n)
+            return self.results[n]
+        self.misses += 1
+        # start from the largest remembered factorial below n
+        k, result = 0, 1
+        for known in self.results:
+            if k < known < n:
+                k = known
+        if k > 0:
+            result = self.results[k]
+        result *= rangeProduct(k + 1, n)
+        self.remember(n, result)
+        return result
+
+
+defaultCache = FactorialCache()
+
+
+def factorial(n):
+    """Assumes n an int >= 0; returns n!"""
+    return defaultCache.factorial(n)
+
+
+def binomial(n, k):
+    """Assumes n, k ints >= 0
+       Returns the number of ways to choose k things out of n (0 if k > n)"""
+    if n < 0 or k < 0:
+        raise ValueError('n and k must be >= 0')
+    if k > n:
+        return 0
+    k = min(k, n - k)
+    return rangeProduct(n - k + 1, n) // rangeProduct(1, k)
+
+
+def factorialTable(n, p):
+    """Returns a list of 0!, 1!, ..., n! modulo p"""
+    table = [1 % p] * (n + 1)
+    for i in range(1, n + 1):
+        table[i] = table[i - 1] * i % p
+    return table
+
+
+def factorialsMod(ns, p):
+    """Assumes ns is a sequence of ints >= 0, p an int > 0
+       Returns a list with n! modulo p for each n in ns"""
+    if p <= 0:
+        raise ValueError('p must be positive')
+    if not ns:
+        return []
+    if min(ns) < 0:
+        raise ValueError('n must be >= 0')
+    # from n = p on, n! has the factor p, so only factorials below p need the table
+    table = factorialTable(min(max(ns), p - 1), p)
+    return [table[n] if n < p else 0 for n in ns]
+
+
+def binomialsMod(pairs, p):
+    """Assumes pairs is a sequence of (n, k) tuples of ints >= 0 with every n < p, p a prime
+       Returns a list with "n choose k" modulo p for each pair"""
+    if not pairs:
+        return []
+    largest = max(n for n, k in pairs)
+    if largest >= p:
+        raise ValueError('every n must be < p')
+    table = factorialTable(largest, p)
+    # 1 / (k! (n-k)!) modulo p is (k! (n-k)!)^(p-2) (Fermat's little theorem, p prime)
+    inverse = lambda x: pow(x, p - 2, p)
+    answers = []
+    for n, k in pairs:
+        if n < 0 or k < 0:
+            raise ValueError('n and k must be >= 0')
+        if k > n:
+            answers.append(0)
+        else:
+            answers.append(table[n] * inverse(table[k] * table[n - k] % p) % p)
+    return answers
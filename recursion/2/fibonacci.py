@@ -0,0 +1,155 @@
+# Fibonacci numbers, three ways that scale
+
+# The `fib` of session 9 (`recursions_u2l4_CODE_part_2.py`) calls itself twice per call, so
+# `fib(x)` makes about 2^x calls (fib(40) already takes minutes) and it goes one level deeper per
+# unit of x, so somewhere near x = 1000 it hits Python's recursion limit. This file gives the same
+# numbers with the same convention, fib(0) = fib(1) = 1 (i.e. fib(x) is the usual F(x+1)), through
+# three engines:
+
+# * `FibCache`: memoization. It remembers up to `maxSize` results (least recently used are dropped
+#   first) and starts each new one from the closest pair of consecutive results it remembers, so
+#   repeated and nearby questions are cheap. It loops instead of recursing, so any x works
+# * `fibIter`: the plain loop, O(x) additions and O(1) memory
+# * `fibDoubling`: "fast doubling", O(log x) steps. It is the matrix-power method
+#   [[1, 1], [1, 0]]^n written out with only the two numbers that matter:
+#       F(2k)   = F(k) * (2*F(k+1) - F(k))
+#       F(2k+1) = F(k)^2 + F(k+1)^2
+#   With big integers the multiplications dominate, and there are only about log2(x) of them
+
+# `fib(x, engine = 'doubling')` picks one. `python fibonacci.py` compares the engines (and the
+# original recursion, for small x).
+
+import argparse
+from collections import OrderedDict
+import time
+
+
+def fibRecur(x):
+    """The original double recursion of session 9, kept for comparison
+       Assumes x an int >= 0; returns Fibonacci of x"""
+    if x == 0 or x == 1:
+        return 1
+    else:
+        return fibRecur(x-1) + fibRecur(x-2)
+
+
+def fibIter(x):
+    """Assumes x an int >= 0; returns Fibonacci of x"""
+    previous, current = 1, 1 #fib(0), fib(1)
+    for i in range(x - 1):
+        previous, current = current, previous + current
+    return current
+
+
+def fibDoubling(x):
+    """Assumes x an int >= 0; returns Fibonacci of x"""
+    # walk the bits of n = x + 1 from the highest, keeping (F(k), F(k+1)) for the prefix k read so
+    # far: a 0 bit doubles k, a 1 bit doubles it and adds one
+    n = x + 1
+    a, b = 0, 1 #F(0), F(1)
+    for bit in bin(n)[2:]:
+        a, b = a * (2 * b - a), a * a + b * b #F(2k), F(2k+1)
+        if bit == '1':
+            a, b = b, a + b
+    return a
+
+
+class FibCache(object):
+    #results is an OrderedDict mapping x to fib(x), least recently used first
+    def __init__(self, maxSize = 1024):
+        """Assumes maxSize an int >= 2 (the number of results kept)"""
+        if maxSize < 2:
+            raise ValueError('maxSize must be at least 2')
+        self.maxSize = maxSize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    def clear(self):
+        self.results.clear()
+    def remember(self, x, value):
+        self.results[x] = value
+        self.results.move_to_end(x)
+        if len(self.results) > self.maxSize:
+            self.results.popitem(last = False)
+    def fib(self, x):
+        """Assumes x an int >= 0; returns Fibonacci of x"""
+        if x in self.results:
+            self.hits += 1
+            self.results.move_to_end(x)
+            return self.results[x]
+        self.misses += 1
+        # start from the highest remembered pair fib(k-1), fib(k) with k < x (or from the base
+        # cases) and step forward
+        k, previous, current = 1, 1, 1
+        for known in self.results:
+            if k < known < x and known - 1 in self.results:
+                k = known
+        if k > 1:
+            previous, current = self.results[k - 1], self.results[k]
+        if x == 0:
+            current = 1
+        for i in range(x - k):
+            previous, current = current, previous + current
+        if x > 0:
+            self.remember(x - 1, previous) #so that x + 1, x + 2... can start from here
+        self.remember(x, current)
+        return current
+
+
+defaultCache = FibCache()
+
+ENGINES = {'memo': defaultCache.fib, 'iter': fibIter, 'doubling': fibDoubling}
+
+
+def fib(x, engine = 'doubling'):
+    """Assumes x an int >= 0, engine 'memo', 'iter' or 'doubling'
+       Returns Fibonacci of x (fib(0) = fib(1) = 1)"""
+    if engine not in ENGINES:
+        raise ValueError('Unknown engine: ' + str(engine))
+    if x < 0:
+        raise ValueError('x must be >= 0')
+    return ENGINES[engine](x)
+
+
+# ..................................................................................................
+# Benchmark
+
+def timeEngine(function, x, repeat):
+    """Returns the best of repeat timings, in seconds, of function(x)"""
+    best = None
+    for i in range(repeat):
+        began = time.perf_counter()
+        function(x)
+        elapsed = time.perf_counter() - began
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def compareEngines(sizes, repeat = 3, recurLimit = 25):
+    """Returns a list of (x, engine name, seconds); the original recursion only runs for
+       x <= recurLimit. The memo engine runs with an empty cache, then again with a warm one"""
+    results = []
+    for x in sizes:
+        expected = fibDoubling(x)
+        engines = [('iter', fibIter), ('doubling', fibDoubling)]
+        if x <= recurLimit:
+            engines.insert(0, ('recursive', fibRecur))
+        for name, function in engines:
+            results.append((x, name, timeEngine(function, x, repeat)))
+        cache = FibCache()
+        results.append((x, 'memo cold', timeEngine(lambda x: (cache.clear(), cache.fib(x)), x,
+                                                   repeat)))
+        results.append((x, 'memo warm', timeEngine(cache.fib, x, repeat)))
+        if cache.fib(x) != expected or fibIter(x) != expected:
+            raise AssertionError('engines disagree at x = ' + str(x))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Compare the Fibonacci engines')
+    parser.add_argument('--sizes', nargs = '+', type = int, default = [20, 1000, 10000, 100000])
+    parser.add_argument('--repeat', type = int, default = 3)
+    args = parser.parse_args()
+    for x, name, seconds in compareEngines(args.sizes, args.repeat):
+        print('%8d  %-10s %12.6f s' % (x, name, seconds))
@@ -0,0 +1,163 @@
+# Greatest common divisors, fast
+
+# `gcdIter` of the session 8 exercises (`recursions_u2l4_CODE_part_2.py`) tries every number from
+# min(a, b) down to 1: O(min(a, b)) steps, so for two 64-bit numbers it would run for centuries.
+# `gcdRecur` uses Euclid's rule, gcd(a, b) = gcd(b, a % b), which is fast (the numbers at least
+# halve every two steps), but it recurses and its listing is full of debug prints. This file has:
+
+# * `gcd(a, b)`: Euclid's rule as a loop
+# * `binaryGcd(a, b)`: Stein's algorithm, which only shifts and subtracts (no division): take out
+#   the common factors of 2, then gcd(a, b) = gcd(|a - b|, min(a, b)) for odd a and b
+# * `lcm(a, b)`: the least common multiple, a // gcd(a, b) * b
+# * `extendedGcd(a, b)`: (g, x, y) with a*x + b*y = g = gcd(a, b), e.g. to find modular inverses
+# * `gcdOf(values)` / `lcmOf(values)`: one gcd (lcm) of a whole sequence. If NumPy is installed and
+#   values is a NumPy array, NumPy's `gcd.reduce` / `lcm.reduce` does it without a Python loop
+
+# All of them take any ints: negative numbers act as their absolute value and gcd(0, 0) is 0.
+# `python gcd.py` times them against the original `gcdIter`.
+
+import argparse
+import random
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def gcdCountdown(a, b):
+    """The original gcdIter, kept for comparison
+       Assumes a, b positive ints; returns the greatest common divisor of a and b"""
+    testValue = min(a, b)
+    while a % testValue != 0 or b % testValue != 0:
+        testValue -= 1
+    return testValue
+
+
+def gcd(a, b):
+    '''
+    a, b: ints
+
+    returns: an int >= 0, the greatest common divisor of a & b
+    '''
+    a, b = abs(a), abs(b)
+    while b != 0:
+        a, b = b, a % b
+    return a
+
+
+def binaryGcd(a, b):
+    '''
+    a, b: ints
+
+    returns: an int >= 0, the greatest common divisor of a & b
+    '''
+    a, b = abs(a), abs(b)
+    if a == 0 or b == 0:
+        return a | b
+    # 2^shift is the largest power of 2 dividing both (the lowest set bit of a | b)
+    shift = ((a | b) & -(a | b)).bit_length() - 1
+    a >>= (a & -a).bit_length() - 1 #make a odd
+    while b != 0:
+        b >>= (b & -b).bit_length() - 1 #make b odd
+        if a > b:
+            a, b = b, a
+        b -= a #odd - odd: even, or 0 when done
+    return a << shift
+
+
+def lcm(a, b):
+    '''
+    a, b: ints
+
+    returns: an int >= 0, the least common multiple of a & b (0 if either is 0)
+    '''
+    if a == 0 or b == 0:
+        return 0
+    return abs(a // gcd(a, b) * b)
+
+
+def extendedGcd(a, b):
+    """Assumes a, b ints
+       Returns a tuple (g, x, y) with g = gcd(a, b) and a*x + b*y == g"""
+    # keep two rows (r, x, y) with a*x + b*y == r and run Euclid's rule on r
+    oldR, r = a, b
+    oldX, x = 1, 0
+    oldY, y = 0, 1
+    while r != 0:
+        quotient = oldR // r
+        oldR, r = r, oldR - quotient * r
+        oldX, x = x, oldX - quotient * x
+        oldY, y = y, oldY - quotient * y
+    if oldR < 0:
+        oldR, oldX, oldY = -oldR, -oldX, -oldY
+    return oldR, oldX, oldY
+
+
+def gcdOf(values):
+    """Assumes values is an iterable of ints (or a NumPy array of ints)
+       Returns the greatest common divisor of all of them (0 if there are none)"""
+    if np is not None and isinstance(values, np.ndarray):
+        return int(np.gcd.reduce(values, axis = None)) if values.size else 0
+    result = 0
+    for value in values:
+        result = gcd(result, value)
+        if result == 1: #nothing can make it smaller
+            break
+    return result
+
+
+def lcmOf(values):
+    """Assumes values is an iterable of ints (or a NumPy array of ints, whose lcm must fit in the
+       array's dtype)
+       Returns the least common multiple of all of them (1 if there are none)"""
+    if np is not None and isinstance(values, np.ndarray):
+        return int(np.lcm.reduce(values, axis = None)) if values.size else 1
+    result = 1
+    for value in values:
+        result = lcm(result, value)
+        if result == 0:
+            break
+    return result
+
+
+# ..................................................................................................
+# Benchmark
+
+def timeFunction(function, pairs, repeat):
+    """Returns the best of repeat timings, in seconds, of function on every pair"""
+    best = None
+    for i in range(repeat):
+        began = time.perf_counter()
+        for a, b in pairs:
+            function(a, b)
+        elapsed = time.perf_counter() - began
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def compareGcds(bits, count = 100, repeat = 3, seed = 0, countdownBits = 20):
+    """Returns a list of (bits, function name, seconds) for count random pairs of numbers of each
+       size in bits; the original countdown only runs up to countdownBits bits"""
+    rng = random.Random(seed)
+    results = []
+    for size in bits:
+        pairs = [(rng.getrandbits(size) | 1, rng.getrandbits(size) | 1) for i in range(count)]
+        functions = [('gcd', gcd), ('binaryGcd', binaryGcd)]
+        if size <= countdownBits:
+            functions.insert(0, ('gcdIter (original)', gcdCountdown))
+        for name, function in functions:
+            results.append((size, name, timeFunction(function, pairs, repeat)))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Compare gcd algorithms')
+    parser.add_argument('--bits', nargs = '+', type = int, default = [12, 20, 64, 1024])
+    parser.add_argument('--count', type = int, default = 100)
+    parser.add_argument('--repeat', type = int, default = 3)
+    args = parser.parse_args()
+    for size, name, seconds in compareGcds(args.bits, args.count, args.repeat):
+        print('%6d bits  %-20s %12.6f s' % (size, name, seconds))
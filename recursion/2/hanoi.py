@@ -0,0 +1,100 @@
+# Towers of Hanoi without recursion
+
+# `Towers` of session 8 (`recursions_u2l4_CODE_part_2.py`) prints its moves as it recurses, so
+# the only way to get the moves is to print all 2^n - 1 of them, in order. For big n that is
+# impossible (n = 64 would take longer than the age of the universe), yet the moves follow a simple
+# pattern that gives any one of them directly:
+
+# * number the moves k = 1, 2, ..., 2^n - 1. Move k moves disk d (1 is the smallest), where d - 1
+#   is the number of trailing zero bits of k: disk 1 moves every other time, disk 2 every fourth...
+# * with the pegs numbered 0 (fr), 1 and 2, move k goes from peg (k & (k-1)) % 3 to peg
+#   ((k | (k-1)) + 1) % 3. For an even n, pegs 1 and 2 are `to` and `spare`; for an odd n they are
+#   the other way around
+
+# So the k-th move takes a few operations on k (O(1) for the sizes that matter), with no recursion
+# and no memory of the earlier moves:
+
+# * `hanoiMove(n, k, fr, to, spare)`: the k-th move, as a tuple (fr, to)
+# * `hanoiMoves(n, fr, to, spare, start = 1, stop = None)`: a generator of the moves start to stop
+#   (all of them by default), in the same order `Towers` prints them. Nothing is built in advance,
+#   so it can page through, or stop early in, the moves of a huge tower
+# * `writeMoves(n, fr, to, spare, out, ...)`: writes the moves as `printMove` lines to a file,
+#   several thousand characters per write
+
+import io
+import itertools
+import sys
+
+
+def numMoves(n):
+    """Returns the number of moves needed for n disks"""
+    return 2 ** n - 1
+
+
+def hanoiPegs(n, fr, to, spare):
+    """Returns the pegs in the numbering of the move formula"""
+    if n % 2 == 0:
+        return (fr, to, spare)
+    return (fr, spare, to)
+
+
+def checkMove(n, k):
+    if n < 1:
+        raise ValueError('n must be >= 1')
+    if not 1 <= k <= numMoves(n):
+        raise ValueError('k must be between 1 and 2^n - 1')
+
+
+def hanoiMove(n, k, fr, to, spare):
+    """Assumes n an int >= 1, k an int between 1 and 2^n - 1
+       Returns the k-th move (counting from 1) of the n-disk tower from fr to to, as a tuple
+       (from peg, to peg)"""
+    checkMove(n, k)
+    pegs = hanoiPegs(n, fr, to, spare)
+    return pegs[(k & (k - 1)) % 3], pegs[((k | (k - 1)) + 1) % 3]
+
+
+def hanoiDisk(k):
+    """Assumes k an int >= 1; returns the disk (1 is the smallest) that move k moves"""
+    return (k & -k).bit_length()
+
+
+def hanoiMoves(n, fr, to, spare, start = 1, stop = None):
+    """Assumes n an int >= 1, start and stop ints between 1 and 2^n - 1 (stop None: the last move)
+       Yields the moves start, start+1, ..., stop of the n-disk tower from fr to to, each a tuple
+       (from peg, to peg)"""
+    if stop is None:
+        stop = numMoves(n)
+    checkMove(n, start)
+    checkMove(n, stop)
+    pegs = hanoiPegs(n, fr, to, spare)
+    k = start
+    while k <= stop:
+        yield pegs[(k & (k - 1)) % 3], pegs[((k | (k - 1)) + 1) % 3]
+        k += 1
+
+
+def writeMoves(n, fr, to, spare, out = None, start = 1, stop = None, chunkSize = 4096):
+    """Writes moves start to stop of the n-disk tower from fr to to to the file out (None: the
+       standard output), one 'move from fr to to' line each, in writes of about chunkSize
+       characters; returns the number of moves written"""
+    if out is None:
+        out = sys.stdout
+    buffer = io.StringIO()
+    count = 0
+    for fr, to in hanoiMoves(n, fr, to, spare, start, stop):
+        buffer.write('move from ' + str(fr) + ' to ' + str(to) + '\n')
+        count += 1
+        if buffer.tell() >= chunkSize:
+            out.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+    out.write(buffer.getvalue())
+    return count
+
+
+# tester .........................................
+if __name__ == '__main__':
+    writeMoves(4, "a", "b", "spare pillar")                     #the same moves as Towers(4, ...)
+    print(hanoiMove(64, 2 ** 63, "a", "b", "spare pillar"))     #the middle move of 64 disks
+    print(list(itertools.islice(hanoiMoves(64, "a", "b", "c", start = 10 ** 18), 3)))
@@ -0,0 +1,74 @@
+# Multiplication by doubling ("Russian peasant" multiplication)
+
+# `mult_iter` and `mult` of session 6 (`recursions_u2l4_CODE_part_1.py`) compute a*b as
+# a + a + ... + a, b times: b additions, and `mult` also goes b calls deep. They only work for
+# b >= 1 (`mult_iter` returns 0 for any b <= 0, `mult` never stops for b <= 0).
+
+# Doubling needs far fewer additions. Write b in binary, e.g. 13 = 8 + 4 + 1, so
+# a*13 = a*8 + a*4 + a*1. Adding a to itself over and over gives a, 2a, 4a, 8a...; the answer is
+# the sum of the ones whose bit in b is set: about 2 * log2(b) additions. It is the same idea as
+# `iterPower` in `power.py`, with + in place of *.
+
+# * `mult(a, b)`: any a that can be added to itself (int, float...) and any int b: a negative b
+#   multiplies -a by -b, and b = 0 gives 0
+# * `batchMult(as_, bs)`: many products at once. If NumPy is installed and one of the operands is a
+#   NumPy array, every step doubles and adds whole arrays; otherwise it is `mult` on each pair
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def mult(a, b):
+    '''
+    a: int or float
+    b: int
+
+    returns: a*b, computed with about 2 * log2(|b|) additions
+    '''
+    if b < 0:
+        a, b = -a, -b
+    result = a - a #a zero of the same type as a
+    while b > 0:
+        if b & 1: #the lowest bit of b is set: this multiple of a is in the sum
+            result = result + a
+        b = b >> 1
+        if b > 0:
+            a = a + a
+    return result
+
+
+def batchMult(as_, bs):
+    """Assumes as_ and bs are sequences of the same length (or one of them a single number, used
+       for every element), every b an int
+       Returns a*b for each pair: a NumPy array if NumPy is installed and as_ or bs is a NumPy
+       array (computed in the array's dtype, so integer results that do not fit in it wrap
+       around), otherwise a list"""
+    if np is not None and (isinstance(as_, np.ndarray) or isinstance(bs, np.ndarray)):
+        return numpyMult(as_, bs)
+    if not hasattr(as_, '__len__'):
+        return [mult(as_, b) for b in bs]
+    if not hasattr(bs, '__len__'):
+        return [mult(a, bs) for a in as_]
+    if len(as_) != len(bs):
+        raise ValueError('as_ and bs must have the same length')
+    return [mult(as_[i], bs[i]) for i in range(len(as_))]
+
+
+def numpyMult(as_, bs):
+    """mult on whole arrays: each step handles one bit of every b"""
+    bs = np.asarray(bs)
+    if bs.dtype.kind not in 'iu':
+        raise ValueError('bs must be integers')
+    as_, bs = np.broadcast_arrays(np.asarray(as_), bs)
+    negative = bs < 0
+    a = np.where(negative, -as_, as_)
+    b = np.abs(bs)
+    result = np.zeros(a.shape, dtype = a.dtype)
+    while b.any():
+        odd = (b & 1).astype(bool)
+        result = np.where(odd, result + a, result)
+        a = a + a
+        b >>= 1
+    return result
@@ -0,0 +1,115 @@
+# Checking palindromes in linear time, for strings, huge files and many strings
+
+# `isPalindrome` of session 10 (`recursions_u2l4_CODE_part_2.py`) first builds the cleaned-up
+# string with `ans = ans + c` (a new string per character) and then `isPal` calls itself on
+# `s[1:-1]` (another new string per call). So the check takes O(n^2) time and memory, and a text of
+# a few thousand letters hits the recursion limit.
+
+# The same check, with the same rule (only the letters a-z count, in either case; spaces,
+# punctuation, digits and anything else are skipped), can walk two positions towards each other:
+
+# * `isPalindrome(s)`: `i` starts at the left end and `j` at the right end; each skips what does
+#   not count, then the two letters must match. O(n) time, nothing copied
+# * `isPalindromeFile(source)`: a file (a name or a binary file object) too big to read into memory,
+#   opened through `mmap` so the operating system pages it in as needed. The two ends are read in
+#   blocks of `chunkSize` bytes, cleaned with `bytes.translate` (in C, not one character at a time
+#   in Python) and compared. A stream that cannot be mapped (a pipe, standard input) is first
+#   copied block by block to a temporary file. The file is read as bytes, so only ASCII letters
+#   count: bytes of other characters are skipped, as the original skips non-ASCII letters
+# * `isPalindromes(strings)`: a list of answers for many strings. ASCII strings (most of them, in
+#   practice) are cleaned and compared in C with `bytes.translate`, the others with `isPalindrome`
+
+import mmap
+import os
+import shutil
+import tempfile
+
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+UPPER = LETTERS.upper().encode('ascii')
+LOWER = LETTERS.encode('ascii')
+TO_LOWER = bytes.maketrans(UPPER, LOWER)
+NOT_LETTERS = bytes(b for b in range(256) if b not in UPPER and b not in LOWER)
+
+
+def isPalindrome(s):
+    """Assumes s is a str
+       Returns True if the letters a-z of s (ignoring case and everything else) read the same
+       backwards"""
+    i, j = 0, len(s) - 1
+    while True:
+        while i < j and s[i].lower() not in LETTERS:
+            i += 1
+        while i < j and s[j].lower() not in LETTERS:
+            j -= 1
+        if i >= j:
+            return True
+        if s[i].lower() != s[j].lower():
+            return False
+        i += 1
+        j -= 1
+
+
+def cleanBytes(data):
+    """Returns the ASCII letters of the bytes-like data, lowercased, as bytes"""
+    return bytes(data).translate(TO_LOWER, NOT_LETTERS)
+
+
+def isPalindromeBuffer(data, chunkSize = 1 << 16):
+    """Assumes data is a bytes-like object (bytes, memoryview, mmap...)
+       Returns True if its ASCII letters (ignoring case) read the same backwards"""
+    lo, hi = 0, len(data)
+    front = back = b'' #cleaned letters read from each end and not matched yet (back is reversed)
+    while lo < hi:
+        if not front:
+            stop = min(lo + chunkSize, hi)
+            front = cleanBytes(data[lo:stop])
+            lo = stop
+        if not back and lo < hi:
+            begin = max(hi - chunkSize, lo)
+            back = cleanBytes(data[begin:hi])[::-1]
+            hi = begin
+        n = min(len(front), len(back))
+        if front[:n] != back[:n]:
+            return False
+        front, back = front[n:], back[n:]
+    # every byte has been read: what is left unmatched is the middle of the letters
+    middle = front + back[::-1]
+    return middle == middle[::-1]
+
+
+def isPalindromeFile(source, chunkSize = 1 << 16):
+    """Assumes source is a file name or a binary file object
+       Returns True if the ASCII letters of the file (ignoring case) read the same backwards"""
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, 'rb') as f:
+            return isPalindromeFile(f, chunkSize)
+    try:
+        fileno = source.fileno()
+        size = os.fstat(fileno).st_size
+        mappable = source.seekable()
+    except (AttributeError, OSError, ValueError):
+        mappable = False
+    if not mappable:
+        # a stream: copy it to a temporary file that can be mapped
+        with tempfile.TemporaryFile() as copy:
+            shutil.copyfileobj(source, copy, chunkSize)
+            copy.flush()
+            return isPalindromeFile(copy, chunkSize)
+    if size == 0:
+        return True #mmap cannot map an empty file
+    with mmap.mmap(fileno, 0, access = mmap.ACCESS_READ) as data:
+        return isPalindromeBuffer(data, chunkSize)
+
+
+def isPalindromes(strings):
+    """Assumes strings is an iterable of str
+       Returns a list with isPalindrome(s) for each s in strings"""
+    answers = []
+    for s in strings:
+        if s.isascii():
+            letters = s.encode('ascii').translate(TO_LOWER, NOT_LETTERS)
+            answers.append(letters == letters[::-1])
+        else:
+            answers.append(isPalindrome(s))
+    return answers
@@ -0,0 +1,142 @@
+# Powers by repeated squaring
+
+# `iterPower` and `recurPower` of session 6 (`recursions_u2l4_CODE_part_1.py`) multiply by `base`
+# once per unit of `exp`: `exp` multiplications, and `recurPower` also goes `exp` calls deep, so
+# an exponent of a few thousand hits the recursion limit. (The second `iterPower` there never sets
+# `result` before using it, so it fails on any exp > 0.)
+
+# Squaring needs far fewer steps. Write exp in binary, e.g. 13 = 0b1101 = 8 + 4 + 1, so
+# base^13 = base^8 * base^4 * base^1. Squaring base over and over gives base^1, base^2, base^4,
+# base^8...; the result is the product of the ones whose bit is set. That is about 2 * log2(exp)
+# multiplications: 40 instead of a million for exp = 10^6.
+
+# * `iterPower(base, exp, mod = None)`: the loop, with the same (base, exp) arguments as before.
+#   With `mod`, every product is reduced modulo `mod` so the numbers never grow (this is what
+#   `pow(base, exp, mod)` does)
+# * `recurPower(base, exp)`: the same idea as a recursion, base^exp = (base^(exp//2))^2 (times
+#   base if exp is odd). It goes only log2(exp) calls deep
+# * `batchPower(bases, exps, mod = None)`: many powers at once. If NumPy is installed and bases
+#   or exps is a NumPy array, every step of the loop squares and multiplies whole arrays; otherwise
+#   it is `iterPower` on each pair
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def checkArguments(exp, mod):
+    if exp < 0:
+        raise ValueError('exp must be >= 0')
+    if mod is not None and mod <= 0:
+        raise ValueError('mod must be positive')
+
+
+def iterPower(base, exp, mod = None):
+    '''
+    base: int or float (an int if mod is given)
+    exp: int >= 0
+    mod: None or an int > 0
+
+    returns: int or float, base^exp (modulo mod, if given)
+    '''
+    checkArguments(exp, mod)
+    result = 1
+    if mod is not None:
+        result = 1 % mod
+        base = base % mod
+    while exp > 0:
+        if exp & 1: #the lowest bit of exp is set: this power of base is in the product
+            result = result * base
+            if mod is not None:
+                result = result % mod
+        exp = exp >> 1
+        if exp > 0: #square for the next bit (not after the last one)
+            base = base * base
+            if mod is not None:
+                base = base % mod
+    return result
+
+
+def recurPower(base, exp):
+    '''
+    base: int or float.
+    exp: int >= 0
+
+    returns: int or float, base^exp
+    '''
+    checkArguments(exp, None)
+    # base case
+    if exp == 0:
+        return 1
+    # recursive step: half the exponent
+    half = recurPower(base, exp // 2)
+    if exp % 2 == 0:
+        return half * half
+    return half * half * base
+
+
+# Largest modulus for the NumPy path: the product of two residues must fit in an int64
+NUMPY_MAX_MOD = 2 ** 31
+
+
+def batchPower(bases, exps, mod = None):
+    """Assumes bases and exps are sequences of the same length (or one of them a single number,
+       used for every element), exps all >= 0, mod None or an int > 0
+       Returns base^exp (modulo mod, if given) for each pair: a NumPy array if NumPy is installed
+       and bases or exps is a NumPy array, otherwise a list
+
+       On the NumPy path the arithmetic is that of the array's dtype: integer results that do not
+       fit in it wrap around, so use a mod or float bases for big powers. With a mod above
+       NUMPY_MAX_MOD the elements are turned into Python ints first (and the result is an array
+       of Python ints, dtype object)"""
+    if np is not None and (isinstance(bases, np.ndarray) or isinstance(exps, np.ndarray)):
+        if mod is None or mod <= NUMPY_MAX_MOD:
+            return numpyPower(bases, exps, mod)
+        # NumPy ints would overflow the products: use Python ints, which never do
+        bases, exps = np.broadcast_arrays(np.asarray(bases), np.asarray(exps))
+        results = batchPower(bases.ravel().tolist(), exps.ravel().tolist(), mod)
+        answer = np.empty(len(results), dtype = object)
+        answer[:] = results
+        return answer.reshape(bases.shape)
+    if not hasattr(bases, '__len__'):
+        return [iterPower(bases, exp, mod) for exp in exps]
+    if not hasattr(exps, '__len__'):
+        return [iterPower(base, exps, mod) for base in bases]
+    if len(bases) != len(exps):
+        raise ValueError('bases and exps must have the same length')
+    return [iterPower(bases[i], exps[i], mod) for i in range(len(bases))]
+
+
+def numpyPower(bases, exps, mod):
+    """iterPower on whole arrays: each step handles one bit of every exponent"""
+    exps = np.asarray(exps)
+    if exps.dtype.kind not in 'iu':
+        raise ValueError('exps must be integers')
+    if exps.size and exps.min() < 0:
+        raise ValueError('exps must be >= 0')
+    if mod is not None and mod <= 0:
+        raise ValueError('mod must be positive')
+    bases = np.asarray(bases)
+    if mod is not None:
+        bases = bases.astype(np.int64) % mod
+    bases, exps = np.broadcast_arrays(bases, exps)
+    base = bases.copy()
+    exps = exps.copy()
+    result = np.ones(base.shape, dtype = base.dtype)
+    if mod is not None:
+        result %= mod
+    # only the elements that need it are multiplied (where =), so a base whose exponent is used up
+    # is not squared again: for floats that could overflow and warn though the result is fine
+    while exps.any():
+        odd = (exps & 1).astype(bool)
+        np.multiply(result, base, out = result, where = odd)
+        if mod is not None:
+            result %= mod
+        exps >>= 1
+        more = exps > 0
+        if more.any(): #square for the next bit (not after the last one)
+            np.multiply(base, base, out = base, where = more)
+            if mod is not None:
+                base %= mod
+    return result
@@ -0,0 +1,148 @@
+# Generating subsets lazily
+
+# `genSubsets` (`genSubsets_with_debugs.py`) returns a list of all 2^n subsets of L: nothing comes
+# out until all of them exist in memory (for n = 30, a billion lists), and every level of the
+# recursion copies `L[:-1]` and builds `smaller + new` again.
+
+# A subset of L can be written as an n-bit number, a "mask": bit i set means L[i] is in it. The
+# masks 0, 1, 2, ..., 2^n - 1 are then all the subsets, in exactly the order `genSubsets` returns
+# them ([], [L[0]], [L[1]], [L[0], L[1]], [L[2]], ...). Counting needs no recursion and no memory,
+# so every function here makes its subsets one at a time, when they are asked for:
+
+# * `genSubsets(L)`: every subset, as a list, in the order of the original
+# * `subsetRange(L, start, stop)`: the subsets with masks start..stop-1, e.g. to page through them
+# * `subsetsOfSize(L, k)`: only the subsets with k elements (the masks with k bits set, each found
+#   from the one before with "Gosper's hack"), in the same relative order
+# * `grayCode(L)`: the subsets in an order where each one differs from the one before by exactly
+#   one element (a Gray code). It yields just that change, (element, added), so a consumer that
+#   keeps a running total (a sum, a set) updates it in O(1) per subset instead of rebuilding it
+# * `parallelSubsets(L, predicate)`: the subsets for which predicate(subset) is True, with the 2^n
+#   masks split in chunks and checked on a pool of processes. Only a few chunks (two per worker)
+#   are handed to the pool at a time, the next one as each finishes, so memory stays the same for
+#   any n and the first subsets come out as soon as the first chunk is done
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import os
+
+
+def subsetOf(L, mask):
+    """Returns the list of the elements of L whose bit is set in mask"""
+    subset = []
+    i = 0
+    while mask:
+        if mask & 1:
+            subset.append(L[i])
+        mask >>= 1
+        i += 1
+    return subset
+
+
+def subsetRange(L, start = 0, stop = None):
+    """Assumes L is a list, 0 <= start <= stop <= 2^len(L) (stop None: 2^len(L))
+       Yields the subsets of L with masks start, start+1, ..., stop-1, each a new list"""
+    if stop is None:
+        stop = 1 << len(L)
+    for mask in range(start, stop):
+        yield subsetOf(L, mask)
+
+
+def genSubsets(L):
+    """Assumes L is a list
+       Yields every subset of L, each a new list, in the order of the recursive genSubsets"""
+    return subsetRange(L)
+
+
+def subsetsOfSize(L, k):
+    """Assumes L is a list, k an int
+       Yields every subset of L with k elements, each a new list, in the order of genSubsets"""
+    n = len(L)
+    if k < 0 or k > n:
+        return
+    if k == 0:
+        yield []
+        return
+    mask = (1 << k) - 1 #the k lowest bits
+    last = mask << (n - k)
+    while True:
+        yield subsetOf(L, mask)
+        if mask == last:
+            return
+        # Gosper's hack: the next larger number with the same number of bits set
+        lowest = mask & -mask
+        ripple = mask + lowest
+        mask = ripple | (((mask ^ ripple) >> 2) // lowest)
+
+
+def grayCode(L):
+    """Assumes L is a list
+       Yields 2^len(L) - 1 changes, each a tuple (element of L, True if added / False if removed):
+       starting from the empty subset and applying them in order visits every subset once"""
+    for k in range(1, 1 << len(L)):
+        i = (k & -k).bit_length() - 1 #step k flips bit i, the lowest set bit of k
+        gray = k ^ (k >> 1)
+        yield L[i], bool(gray >> i & 1)
+
+
+def graySubsets(L):
+    """Assumes L is a list
+       Yields every subset of L (each a new list), each differing from the one before by one
+       element"""
+    current = set()
+    yield []
+    for element, added in grayCode(list(range(len(L)))):
+        if added:
+            current.add(element)
+        else:
+            current.discard(element)
+        yield [L[i] for i in sorted(current)]
+
+
+# ..................................................................................................
+# Parallel search
+
+workerList = None #set in each worker process by setList
+workerPredicate = None
+
+
+def setList(L, predicate):
+    """Worker initializer: keeps L and predicate, so tasks only carry mask ranges"""
+    global workerList, workerPredicate
+    workerList = L
+    workerPredicate = predicate
+
+
+def searchRange(start, stop):
+    """Worker task: returns the masks in start..stop-1 whose subsets satisfy the predicate"""
+    return [mask for mask in range(start, stop) if workerPredicate(subsetOf(workerList, mask))]
+
+
+def parallelSubsets(L, predicate, maxWorkers = None, chunkSize = 1 << 16):
+    """Assumes L is a list, predicate a function of a subset returning a bool, defined at the top
+       level of a module (so it can be sent to the worker processes), maxWorkers None (one per CPU)
+       or an int, chunkSize the number of masks per task
+       Yields the subsets of L for which predicate is True, a chunk at a time in the order the
+       chunks finish (within a chunk, in the order of genSubsets)"""
+    if maxWorkers is None:
+        maxWorkers = os.cpu_count() or 1
+    total = 1 << len(L)
+    starts = iter(range(0, total, chunkSize))
+    window = 2 * maxWorkers #chunks submitted at any time: enough to keep every worker busy
+    with ProcessPoolExecutor(maxWorkers, initializer = setList,
+                             initargs = (L, predicate)) as pool:
+        def submitNext():
+            start = next(starts, None)
+            if start is not None:
+                running.add(pool.submit(searchRange, start, min(start + chunkSize, total)))
+        running = set()
+        for i in range(window):
+            submitNext()
+        try:
+            while running:
+                done, running = wait(running, return_when = FIRST_COMPLETED)
+                for future in done:
+                    submitNext() #keep the window full before handing results to the caller
+                    for mask in future.result():
+                        yield subsetOf(L, mask)
+        finally:
+            for future in running: #if the caller stops early, drop the work not yet started
+                future.cancel()